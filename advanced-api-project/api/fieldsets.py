@@ -0,0 +1,60 @@
+# api/fieldsets.py
+
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def parse_field_list(request, param):
+    return {name.strip() for name in request.query_params.get(param, '').split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin for sparse fieldsets on read requests.
+
+    ?fields=id,title keeps only the listed fields and ?omit=author drops
+    the listed ones; both may be combined. Unknown names are ignored. The
+    fields are dropped when the serializer is built, so they are never
+    read or rendered. Writes always use the full serializer.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return
+        fields, omit = parse_field_list(request, FIELDS_PARAM), parse_field_list(request, OMIT_PARAM)
+        if not fields and not omit:
+            return
+        for name in list(self.fields):
+            if (fields and name not in fields) or name in omit:
+                self.fields.pop(name)
+
+
+class SparseQuerysetMixin:
+    """
+    View mixin that narrows the queryset to the columns the serializer
+    still renders after ?fields= / ?omit=, using QuerySet.only().
+
+    Only fields whose source is a column of the model are projected.
+    Nested and computed fields (such as an author's books and books_count)
+    must not read other columns of the row, or each row would load them
+    with a query of its own.
+    """
+
+    def is_sparse_request(self):
+        params = self.request.query_params
+        return self.request.method in SAFE_METHODS and bool(params.get(FIELDS_PARAM) or params.get(OMIT_PARAM))
+
+    def get_serializer_field_names(self):
+        return set(self.get_serializer().fields)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.is_sparse_request():
+            return queryset
+        columns = {field.name for field in queryset.model._meta.concrete_fields}
+        sources = [field.source for field in self.get_serializer().fields.values() if field.source in columns]
+        return queryset.only(queryset.model._meta.pk.name, *sources)
@@ -0,0 +1,43 @@
+# Indexes for the BookListView filters, search and ordering; see api/models.py.
+
+from django.db import migrations, models
+
+# SearchFilter's icontains lookups compile to UPPER(column) LIKE '%term%' on
+# PostgreSQL, which a trigram index on UPPER(column) can answer. Other
+# databases can not index a LIKE with a leading wildcard.
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX api_book_title_trgm_idx ON api_book USING GIN (UPPER(title) gin_trgm_ops)',
+    'CREATE INDEX api_author_name_trgm_idx ON api_author USING GIN (UPPER(name) gin_trgm_ops)',
+]
+POSTGRES_BACKWARD = [
+    'DROP INDEX api_author_name_trgm_idx',
+    'DROP INDEX api_book_title_trgm_idx',
+]
+
+
+def run_for_vendor(postgres):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor == 'postgresql':
+            for statement in postgres:
+                schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['name'], name='api_author_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['publication_year', 'title'], name='api_book_year_title_idx'),
+        ),
+        migrations.RunPython(run_for_vendor(POSTGRES_FORWARD), run_for_vendor(POSTGRES_BACKWARD)),
+    ]
@@ -11,6 +11,12 @@ class Author(models.Model):
     """
     name = models.CharField(max_length=255, help_text="The full name of the author.")
 
+    class Meta:
+        indexes = [
+            # Backs ?author__name= on the book list, and author name ordering.
+            models.Index(fields=['name'], name='api_author_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -33,6 +39,13 @@ class Book(models.Model):
     class Meta:
         # Ensures that a combination of title and author is unique, preventing duplicate books by the same author.
         unique_together = ('title', 'author')
+        # The unique_together index leads with title, so it already backs
+        # ?title= and ordering by title; author_id is indexed as a ForeignKey.
+        indexes = [
+            # Backs ?publication_year= with the default ordering by title, and
+            # ordering by publication_year.
+            models.Index(fields=['publication_year', 'title'], name='api_book_year_title_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author.name}"
@@ -2,15 +2,17 @@
 
 from rest_framework import serializers
 from .models import Author, Book
+from .fieldsets import SparseFieldsetMixin
 from datetime import date
 
-class BookSerializer(serializers.ModelSerializer):
+class BookSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for the Book model.
 
     This serializer handles the conversion of Book model instances to JSON
     representations and vice-versa. It includes custom validation to ensure
-    that the publication year is not in the future.
+    that the publication year is not in the future. Read requests may
+    select fields with ?fields= / ?omit= (see SparseFieldsetMixin).
     """
     class Meta:
         model = Book
@@ -28,26 +30,40 @@ class BookSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Publication year cannot be in the future.")
         return value
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for the Author model.
 
     This serializer handles the conversion of Author model instances to JSON
     representations. It demonstrates nested serialization by including
-    a representation of all books written by the author.
+    a representation of the books written by the author.
 
-    The 'books' field uses BookSerializer(many=True) to serialize a list of
-    related Book objects. The 'read_only=True' ensures that books cannot be
-    created or updated directly through the AuthorSerializer, but are
-    included in the output when an Author instance is retrieved.
+    The 'books' field uses BookSerializer(many=True) to serialize whatever
+    author.books holds. The author views prefetch only the first few books
+    unless the request asks for ?expand=books (see AuthorBooksMixin), so
+    'books_count' gives the total number of books either way. The
+    'read_only=True' ensures that books cannot be created or updated
+    directly through the AuthorSerializer. Read requests may select fields
+    with ?fields= / ?omit= (see SparseFieldsetMixin).
     """
-    # Nested serializer to display all books related to an author.
+    # Nested serializer to display the books related to an author.
     # 'many=True' indicates that there can be multiple books.
     # 'read_only=True' means this field is only for output and cannot be
     # used for creating or updating books via the AuthorSerializer.
     books = BookSerializer(many=True, read_only=True)
+    books_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Author
-        fields = ['id', 'name', 'books'] # Include 'books' to show nested relationship
+        fields = ['id', 'name', 'books_count', 'books'] # Include 'books' to show nested relationship
 
+    def get_books_count(self, author):
+        """
+        Use the count annotated by the author views, and count the books
+        directly for instances that were not loaded through them (e.g. the
+        response to a create or update).
+        """
+        count = getattr(author, 'books_count', None)
+        if count is None:
+            count = Book.objects.filter(author=author).count()
+        return count
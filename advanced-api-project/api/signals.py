@@ -0,0 +1,16 @@
+# api/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .conditional import bump_catalog_version
+from .models import Author, Book
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def catalog_changed(sender, **kwargs):
+    """
+    Invalidate the ETags of every book and author response.
+    """
+    bump_catalog_version()
@@ -0,0 +1,41 @@
+# api/test_conditional.py
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import Author, Book
+
+class ConditionalGetTests(APITestCase):
+    """
+    ETag handling on the book and author read endpoints.
+    A client that sends back the ETag it was given gets 304 until a book or
+    author is written.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name="Jane Doe")
+        self.book = Book.objects.create(title="Book", publication_year=2020, author=self.author)
+        self.urls = [
+            reverse('book-list'),
+            reverse('book-detail', kwargs={'pk': self.book.pk}),
+            reverse('author-list'),
+            reverse('author-detail', kwargs={'pk': self.author.pk}),
+        ]
+
+    def test_unchanged_resources_are_not_resent(self):
+        for url in self.urls:
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(0):
+                response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_writes_change_the_etag(self):
+        etags = [self.client.get(url)['ETag'] for url in self.urls]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = "Renamed"
+            self.book.save()
+        for url, etag in zip(self.urls, etags):
+            response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
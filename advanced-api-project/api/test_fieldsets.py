@@ -0,0 +1,64 @@
+# api/test_fieldsets.py
+
+import json
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import Author, Book
+
+class SparseFieldsetTests(APITestCase):
+    """
+    ?fields= and ?omit= trim both the serialized fields and the columns read.
+    """
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Jane Doe")
+        self.book = Book.objects.create(title="The First Journey", publication_year=2020, author=self.author)
+
+    def get_with_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+            data = json.loads(b''.join(response.streaming_content)) if response.streaming else response.data
+        return data, [query['sql'] for query in queries.captured_queries]
+
+    def test_book_list_fields(self):
+        data, queries = self.get_with_queries(reverse('book-list'), {'fields': 'id,title'})
+        self.assertEqual(data, [{'id': self.book.pk, 'title': "The First Journey"}])
+        self.assertNotIn('publication_year', queries[0])
+
+    def test_book_detail_omit(self):
+        url = reverse('book-detail', kwargs={'pk': self.book.pk})
+        data, queries = self.get_with_queries(url, {'omit': 'author,publication_year'})
+        self.assertEqual(set(data), {'id', 'title'})
+        self.assertNotIn('author_id', queries[0])
+
+    def test_unknown_fields_are_ignored(self):
+        data, _ = self.get_with_queries(reverse('book-list'), {'fields': 'title,isbn'})
+        self.assertEqual(data, [{'title': "The First Journey"}])
+
+    def test_author_list_without_books(self):
+        data, queries = self.get_with_queries(reverse('author-list'), {'fields': 'id,name'})
+        self.assertEqual(data, [{'id': self.author.pk, 'name': "Jane Doe"}])
+        # Neither the book count nor the nested books are loaded.
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('api_book', queries[0])
+
+    def test_author_detail_books_count_only(self):
+        url = reverse('author-detail', kwargs={'pk': self.author.pk})
+        data, queries = self.get_with_queries(url, {'omit': 'books'})
+        self.assertEqual(data, {'id': self.author.pk, 'name': "Jane Doe", 'books_count': 1})
+        self.assertEqual(len(queries), 1)
+
+    def test_writes_use_every_field(self):
+        self.client.force_authenticate(User.objects.create_user(username='writer', password='testpassword'))
+        response = self.client.post(
+            reverse('book-create') + '?fields=id',
+            {'title': "Second", 'publication_year': 2021, 'author': self.author.pk},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(set(response.data), {'id', 'title', 'publication_year', 'author'})
@@ -0,0 +1,24 @@
+# api/test_indexes.py
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from api.models import Book
+
+class BookFilterIndexTests(TestCase):
+    """
+    Runs the BookListView filter benchmark on a small table and checks that
+    every filter and ordering combination is index-backed. Only search may
+    scan, since SQLite can not index LIKE '%term%'.
+    """
+
+    def test_filters_are_index_backed(self):
+        out = StringIO()
+        call_command('benchmark_book_filters', books=2000, books_per_author=10, stdout=out)
+        rows = [line for line in out.getvalue().splitlines() if ' ms ' in line]
+        self.assertEqual(len(rows), 18)
+        scanned = [row for row in rows if 'full scan' in row]
+        self.assertTrue(all('search=' in row for row in scanned), scanned)
+        # The seeded books are rolled back.
+        self.assertFalse(Book.objects.exists())
@@ -0,0 +1,51 @@
+# api/test_queries.py
+
+from rest_framework.test import APITestCase
+from django.urls import reverse
+from api.models import Author, Book
+from api.testing import QueryBudgetMixin
+
+class EndpointQueryCountTests(QueryBudgetMixin, APITestCase):
+    """
+    Query-count regression tests for the api URLconf.
+    Each list and detail endpoint is requested at two data sizes and must run
+    the same number of SQL queries for both.
+    """
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Jane Doe")
+        self.book = Book.objects.create(title="Book 0", publication_year=2020, author=self.author)
+
+    def seed_books(self, n):
+        """
+        Add n books, each by a new author.
+        """
+        start = Book.objects.count()
+        for i in range(start, start + n):
+            Book.objects.create(title=f"Book {i}", publication_year=2020, author=Author.objects.create(name=f"Author {i}"))
+
+    def seed_author_books(self, n):
+        """
+        Add n books to self.author.
+        """
+        start = Book.objects.count()
+        Book.objects.bulk_create([
+            Book(title=f"Book {i}", publication_year=2020, author=self.author) for i in range(start, start + n)
+        ])
+
+    def test_book_list(self):
+        self.assertQueryCountConstant(reverse('book-list'), self.seed_books, max_queries=1)
+
+    def test_book_detail(self):
+        self.assertQueryCountConstant(reverse('book-detail', kwargs={'pk': self.book.pk}), self.seed_books, max_queries=1)
+
+    def test_author_list(self):
+        self.assertQueryCountConstant(reverse('author-list'), self.seed_books, max_queries=2)
+
+    def test_author_list_expanded(self):
+        url = reverse('author-list') + '?expand=books'
+        self.assertQueryCountConstant(url, self.seed_author_books, max_queries=2)
+
+    def test_author_detail(self):
+        url = reverse('author-detail', kwargs={'pk': self.author.pk})
+        self.assertQueryCountConstant(url, self.seed_author_books, max_queries=2)
@@ -0,0 +1,49 @@
+# api/test_streaming.py
+
+import gzip
+import json
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from api.models import Author, Book
+from api.serializers import AuthorSerializer
+from api.views import AuthorListView
+
+class StreamingListTests(APITestCase):
+    """
+    The author list is streamed as JSON, chunk by chunk, and compressed
+    when the client accepts gzip.
+    """
+
+    def setUp(self):
+        for i in range(5):
+            author = Author.objects.create(name=f"Author {i}")
+            Book.objects.create(title=f"Book {i}", publication_year=2020, author=author)
+        self.url = reverse('author-list')
+
+    def read(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_stream_matches_serializer_output(self):
+        # Chunks smaller than the list exercise the separators between chunks.
+        AuthorListView.stream_chunk_size = 2
+        self.addCleanup(setattr, AuthorListView, 'stream_chunk_size', 500)
+
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        expected = AuthorSerializer(Author.objects.order_by('pk'), many=True).data
+        self.assertEqual(json.loads(self.read(response)), json.loads(json.dumps(expected)))
+
+    def test_empty_list(self):
+        Author.objects.all().delete()
+        self.assertEqual(json.loads(self.read(self.client.get(self.url))), [])
+
+    def test_gzip(self):
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(self.read(response)))), 5)
+
+    def test_browsable_api_is_not_streamed(self):
+        response = self.client.get(self.url, headers={'Accept': 'text/html'})
+        self.assertFalse(response.streaming)
@@ -7,6 +7,7 @@ from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
 from api.models import Author, Book
 from datetime import date
+import json
 
 class BookAPITests(APITestCase):
     """
@@ -316,3 +317,64 @@ class BookAPITests(APITestCase):
         response = self.client.delete(self.delete_url(9999)) # Non-existent ID
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(Book.objects.count(), 4) # No books should be deleted
+
+
+class AuthorBooksTests(APITestCase):
+    """
+    Tests for the nested books of the author endpoints: capped by default,
+    complete with ?expand=books, and always counted in 'books_count'.
+    """
+
+    def setUp(self):
+        self.prolific = Author.objects.create(name="Prolific Author")
+        self.other = Author.objects.create(name="Other Author")
+        Book.objects.bulk_create([
+            Book(title=f"Book {i:02d}", publication_year=2020, author=self.prolific) for i in range(15)
+        ])
+        Book.objects.create(title="Only Book", publication_year=2021, author=self.other)
+        self.list_url = reverse('author-list')
+        self.detail_url = reverse('author-detail', kwargs={'pk': self.prolific.pk})
+
+    def read(self, response):
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_nested_books_are_capped(self):
+        """
+        Ensure each author nests at most ten books, the first by title.
+        """
+        authors = {author['name']: author for author in self.read(self.client.get(self.list_url))}
+        prolific = authors["Prolific Author"]
+        self.assertEqual(prolific['books_count'], 15)
+        self.assertEqual([book['title'] for book in prolific['books']], [f"Book {i:02d}" for i in range(10)])
+        self.assertEqual(authors["Other Author"]['books_count'], 1)
+        self.assertEqual(len(authors["Other Author"]['books']), 1)
+
+    def test_expand_books(self):
+        """
+        Ensure ?expand=books nests every book.
+        """
+        authors = {author['name']: author for author in self.read(self.client.get(self.list_url, {'expand': 'books'}))}
+        self.assertEqual(len(authors["Prolific Author"]['books']), 15)
+
+        response = self.client.get(self.detail_url, {'expand': 'books'})
+        self.assertEqual(len(response.data['books']), 15)
+
+    def test_author_detail_is_capped(self):
+        """
+        Ensure the detail endpoint caps nested books the same way.
+        """
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['books_count'], 15)
+        self.assertEqual(len(response.data['books']), 10)
+
+    def test_create_author_reports_books_count(self):
+        """
+        Ensure authors created through the API serialize without the annotation.
+        """
+        user = User.objects.create_user(username='writer', password='testpassword')
+        self.client.force_authenticate(user)
+        response = self.client.post(reverse('author-create'), {'name': "New Author"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['books_count'], 0)
+        self.assertEqual(response.data['books'], [])
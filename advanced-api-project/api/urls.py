@@ -19,8 +19,8 @@ urlpatterns = [
     path('books/', BookListView.as_view(), name='book-list'),
     path('books/create/', BookCreateView.as_view(), name='book-create'), # Explicit create path
     path('books/<int:pk>/', BookDetailView.as_view(), name='book-detail'),
-    path('books/update/', BookUpdateView.as_view(), name='book-update'), # Explicit update path
-    path('books/delete/', BookDeleteView.as_view(), name='book-delete'), # Explicit delete path
+    path('books/<int:pk>/update/', BookUpdateView.as_view(), name='book-update'), # Explicit update path
+    path('books/<int:pk>/delete/', BookDeleteView.as_view(), name='book-delete'), # Explicit delete path
 
     # Optional: URLs for Author model
     path('authors/', AuthorListView.as_view(), name='author-list'),
@@ -3,16 +3,69 @@
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework import filters
-from django_filters import rest_framework 
+from django.db.models import Count, F, Prefetch, Window
+from django.db.models.functions import RowNumber
+from django_filters import rest_framework
 from .models import Book, Author
 from .serializers import BookSerializer, AuthorSerializer
+from .conditional import ConditionalGetMixin, get_catalog_version
+from .streaming import StreamingListMixin
+from .fieldsets import SparseQuerysetMixin
 
-class BookListView(generics.ListAPIView):
+class CatalogConditionalGetMixin(ConditionalGetMixin):
+    """
+    Conditional GET for book and author endpoints.
+
+    Responses carry an ETag derived from the catalog version, which changes
+    on every book or author write. A client that sends it back in
+    If-None-Match gets 304 Not Modified without any database query.
+    """
+    def get_list_validators(self):
+        return get_catalog_version(), None
+
+    def get_object_validators(self):
+        return get_catalog_version(), None
+
+class AuthorBooksMixin:
+    """
+    Loads authors with their book count and their nested books in two
+    queries, however many authors there are.
+
+    Only the first `nested_books_limit` books (by title) of each author are
+    nested, so one prolific author can not make the response arbitrarily
+    large; 'books_count' tells clients how many there are in total.
+    Requesting ?expand=books nests every book instead. Neither is loaded
+    when a sparse fieldset leaves it out.
+    """
+    nested_books_limit = 10
+
+    def get_expand(self):
+        return {field.strip() for field in self.request.query_params.get('expand', '').split(',') if field.strip()}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_serializer_field_names()
+        if 'books_count' in fields:
+            queryset = queryset.annotate(books_count=Count('books'))
+        if 'books' in fields:
+            books = Book.objects.order_by('title', 'pk')
+            if 'books' not in self.get_expand():
+                # Number each author's books and keep the first few, so the cap
+                # is applied in the database rather than after loading them all.
+                books = books.annotate(
+                    author_position=Window(RowNumber(), partition_by=F('author'), order_by=[F('title'), F('pk')])
+                ).filter(author_position__lte=self.nested_books_limit)
+            queryset = queryset.prefetch_related(Prefetch('books', queryset=books))
+        return queryset
+
+class BookListView(CatalogConditionalGetMixin, SparseQuerysetMixin, generics.ListAPIView):
     """
     API view to list all books.
 
     - GET /books/: Returns a list of all books.
       - Permissions: Allows read access to any user (authenticated or unauthenticated).
+      - Sparse fieldsets: '?fields=id,title' or '?omit=author' trims the response
+        and the columns read.
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
@@ -21,7 +74,7 @@ class BookListView(generics.ListAPIView):
     # --- Filtering Configuration ---
     # Specifies the filter backends to use for this view.
     filter_backends = [
-        rest_framework,   # For exact/range filtering
+        rest_framework.DjangoFilterBackend,   # For exact/range filtering
         filters.SearchFilter,         # For text searching
         filters.OrderingFilter        # For sorting results
     ]
@@ -43,7 +96,7 @@ class BookListView(generics.ListAPIView):
     ordering = ['title'] # Default ordering if none is specified in the request
 
 
-class BookDetailView(generics.RetrieveAPIView):
+class BookDetailView(CatalogConditionalGetMixin, SparseQuerysetMixin, generics.RetrieveAPIView):
     """
     API view to retrieve details of a single book by its ID.
 
@@ -93,17 +146,22 @@ class BookDeleteView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated] # Only authenticated users can delete
 
 # Optional: Add views for Author if needed, similar to Book
-class AuthorListView(generics.ListAPIView):
+class AuthorListView(CatalogConditionalGetMixin, AuthorBooksMixin, SparseQuerysetMixin, StreamingListMixin, generics.ListAPIView):
     """
     API view to list all authors.
+
+    The list is not paginated, so it is streamed (see StreamingListMixin).
+    Books are prefetched per chunk of authors as the stream is read, and
+    capped per author unless ?expand=books is given (see AuthorBooksMixin).
     """
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-class AuthorDetailView(generics.RetrieveAPIView):
+class AuthorDetailView(CatalogConditionalGetMixin, AuthorBooksMixin, SparseQuerysetMixin, generics.RetrieveAPIView):
     """
     API view to retrieve details of a single author by their ID.
+    Nested books are capped unless ?expand=books is given.
     """
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
@@ -0,0 +1,43 @@
+# api/streaming.py
+
+from django.http import StreamingHttpResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+class StreamingListMixin:
+    """
+    List view mixin that streams JSON responses instead of building them
+    in memory.
+
+    Rows are read with QuerySet.iterator() and serialized one at a time, and
+    the encoded array is sent in chunks of `stream_chunk_size` rows. Worker
+    memory stays flat however long the list is, and the first bytes go out
+    as soon as the first chunk is encoded. Paginated views and non-JSON
+    renderers (e.g. the browsable API) get the regular response.
+
+    Once streaming has started the status code is fixed, so an error while
+    reading later rows ends the response early instead of returning a 500.
+    """
+    stream_chunk_size = 500
+
+    def list(self, request, *args, **kwargs):
+        if self.paginator is not None or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(self.stream_json(queryset), content_type='application/json')
+
+    def stream_json(self, queryset):
+        # One serializer instance is reused for every row, so its fields are
+        # only built once.
+        serializer = self.get_serializer()
+        encoder = JSONEncoder(ensure_ascii=not api_settings.UNICODE_JSON, separators=(',', ':'))
+        chunk = []
+        separator = ''
+        yield '['
+        for instance in queryset.iterator(chunk_size=self.stream_chunk_size):
+            chunk.append(separator + encoder.encode(serializer.to_representation(instance)))
+            separator = ','
+            if len(chunk) >= self.stream_chunk_size:
+                yield ''.join(chunk)
+                chunk = []
+        yield ''.join(chunk) + ']'
@@ -1,3 +1,47 @@
-from django.test import TestCase
+# api/tests.py
 
-# Create your tests here.
+import gzip
+import json
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from .models import Book
+from .serializers import BookSerializer
+from .views import BookList
+
+class BookListStreamingTests(APITestCase):
+    """
+    The book list is streamed as JSON, chunk by chunk, and compressed when
+    the client accepts gzip.
+    """
+
+    def setUp(self):
+        Book.objects.bulk_create([Book(title=f"Book {i}", author=f"Author {i}") for i in range(5)])
+        self.url = reverse('book-list')
+
+    def read(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_stream_matches_serializer_output(self):
+        # Chunks smaller than the list exercise the separators between chunks.
+        BookList.stream_chunk_size = 2
+        self.addCleanup(setattr, BookList, 'stream_chunk_size', 500)
+
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        expected = BookSerializer(Book.objects.order_by('pk'), many=True).data
+        self.assertEqual(json.loads(self.read(response)), json.loads(json.dumps(expected)))
+
+    def test_empty_list(self):
+        Book.objects.all().delete()
+        self.assertEqual(json.loads(self.read(self.client.get(self.url))), [])
+
+    def test_gzip(self):
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(self.read(response)))), 5)
+
+    def test_browsable_api_is_not_streamed(self):
+        response = self.client.get(self.url, headers={'Accept': 'text/html'})
+        self.assertFalse(response.streaming)
@@ -7,8 +7,10 @@ from rest_framework import generics
 from rest_framework import viewsets, permissions
 from .models import Book
 from .serializers import BookSerializer
+from .streaming import StreamingListMixin
 
-class BookList(generics.ListAPIView):
+class BookList(StreamingListMixin, generics.ListAPIView):
+    # Unpaginated, so the whole table is streamed rather than built in memory.
     queryset = Book.objects.all()
     serializer_class = BookSerializer
 
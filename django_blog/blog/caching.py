@@ -0,0 +1,79 @@
+# blog/caching.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+# Cached pages and fragments are keyed on version stamps. Editing a post,
+# its comments or its tags replaces the stamps it affects (blog/signals.py),
+# so stale entries are never read again and simply expire. The stamps expire
+# along with the pages cached under them, so requests for arbitrary post ids
+# or tag slugs can not fill the cache with keys that never go away.
+LIST_VERSION = 'blog:version:list'
+
+def post_version_key(post_id):
+    return f'blog:version:post:{post_id}'
+
+def tag_version_key(slug):
+    return f'blog:version:tag:{slug}'
+
+def new_stamp():
+    # A fresh, never repeated value, so a stamp evicted from the cache can
+    # not come back as one that old pages were cached under.
+    return time.time_ns()
+
+def get_page_cache_timeout():
+    return getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 300)
+
+def get_versions(*keys):
+    versions = cache.get_many(keys)
+    missing = {key: new_stamp() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, get_page_cache_timeout())
+        versions.update(missing)
+    return tuple(versions[key] for key in keys)
+
+def bump_versions(*keys):
+    stamp = new_stamp()
+    cache.set_many({key: stamp for key in keys}, get_page_cache_timeout())
+
+def page_cache_key(request, versions):
+    url = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+    return f"blog:page:{url}:{'.'.join(map(str, versions))}"
+
+def cached_for_anonymous(request, version_keys, respond):
+    """
+    Serve a GET by an anonymous visitor from the page cache, or call
+    respond() and cache what it returns. Logged-in users always get a
+    fresh render, since pages show them edit links.
+    """
+    if request.method != 'GET' or request.user.is_authenticated:
+        return respond()
+
+    key = page_cache_key(request, get_versions(*version_keys))
+    cached = cache.get(key)
+    if cached is not None:
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+
+    response = respond()
+    if response.status_code == 200:
+        if hasattr(response, 'render'):
+            response.render()
+        cache.set(key, (response.content, response['Content-Type']), get_page_cache_timeout())
+    return response
+
+class AnonymousPageCacheMixin:
+    """
+    View mixin for cached_for_anonymous(). Views list the version stamps
+    their page depends on in get_page_version_keys().
+    """
+
+    def get_page_version_keys(self):
+        return (LIST_VERSION,)
+
+    def dispatch(self, request, *args, **kwargs):
+        respond = lambda: super(AnonymousPageCacheMixin, self).dispatch(request, *args, **kwargs)
+        return cached_for_anonymous(request, self.get_page_version_keys(), respond)
@@ -0,0 +1,14 @@
+# blog/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from blog.models import Post
+from blog.search import index_post
+
+class Command(BaseCommand):
+    help = 'Rebuild the search tokens of every post.'
+
+    def handle(self, *args, **options):
+        indexed = 0
+        for post in Post.objects.prefetch_related('tags').iterator(chunk_size=500):
+            index_post(post)
+            indexed += 1
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} posts.'))
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:26
+
+import re
+import django.db.models.deletion
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+
+# A frozen copy of the weighting in blog/search.py as of this migration, so
+# replaying it gives the same index whatever that module later becomes.
+TOKEN_RE = re.compile(r'\w+')
+MAX_TOKEN_LENGTH = 100
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 2
+CONTENT_WEIGHT = 1
+
+
+def tokenize(text):
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_RE.findall(text.casefold())]
+
+
+def post_token_weights(title, content, tag_names):
+    weights = Counter()
+    for token in tokenize(title):
+        weights[token] += TITLE_WEIGHT
+    for name in tag_names:
+        for token in tokenize(name):
+            weights[token] += TAG_WEIGHT
+    for token in tokenize(content):
+        weights[token] += CONTENT_WEIGHT
+    return weights
+
+
+def index_existing_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostSearchToken = apps.get_model('blog', 'PostSearchToken')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    TaggedItem = apps.get_model('taggit', 'TaggedItem')
+
+    tag_names = defaultdict(list)
+    content_type = ContentType.objects.filter(app_label='blog', model='post').first()
+    if content_type is not None:
+        tagged = TaggedItem.objects.filter(content_type=content_type).values_list('object_id', 'tag__name')
+        for object_id, name in tagged:
+            tag_names[object_id].append(name)
+
+    tokens = [
+        PostSearchToken(post_id=post.pk, token=token, weight=weight)
+        for post in Post.objects.only('id', 'title', 'content').iterator()
+        for token, weight in post_token_weights(post.title, post.content, tag_names[post.pk]).items()
+    ]
+    PostSearchToken.objects.bulk_create(tokens, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_post_tags'),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100)),
+                ('weight', models.PositiveIntegerField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='blog.post')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('token', 'post'), name='blog_search_token_post_unique')],
+            },
+        ),
+        migrations.RunPython(index_existing_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+# A frozen copy of blog.models.make_preview as of this migration.
+PREVIEW_LENGTH = 150
+
+
+def make_preview(content):
+    return Truncator(content).chars(PREVIEW_LENGTH)
+
+
+def fill_previews(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = list(Post.objects.only('id', 'content'))
+    for post in posts:
+        post.preview = make_preview(post.content)
+    Post.objects.bulk_update(posts, ['preview'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_search_token'),
+        ('taggit', '0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='preview',
+            field=models.CharField(blank=True, editable=False, max_length=150),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-published_date', '-id'], name='blog_post_published_idx'),
+        ),
+        migrations.RunPython(fill_previews, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,36 @@
 # blog/models.py
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils.text import Truncator
 from taggit.managers import TaggableManager
 
+PREVIEW_LENGTH = 150
+
+def make_preview(content):
+    return Truncator(content).chars(PREVIEW_LENGTH)
+
 class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     published_date = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     tags = TaggableManager() 
-    pass
+    # The start of content shown in post listings, stored so listings do not
+    # have to load and truncate every full post body.
+    preview = models.CharField(max_length=PREVIEW_LENGTH, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Backs the newest-first ordering of every post listing.
+            models.Index(fields=['-published_date', '-id'], name='blog_post_published_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.preview = make_preview(self.content)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'preview'}
+        super().save(*args, **kwargs)
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
@@ -20,4 +41,16 @@ class Comment(models.Model):
 
     def __str__(self):
         return f'Comment by {self.author.username} on {self.post.title}'
+
+class PostSearchToken(models.Model):
+    # One row per distinct word of a post, weighted by where it appears.
+    # Maintained by blog/search.py; see index_post().
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=100)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['token', 'post'], name='blog_search_token_post_unique'),
+        ]
   
\ No newline at end of file
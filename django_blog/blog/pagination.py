@@ -0,0 +1,36 @@
+# blog/pagination.py
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+
+class NoCountPaginator(Paginator):
+    """
+    Paginator that never runs COUNT(*) over the whole table.
+
+    Each page fetches one row more than it shows to learn whether a next
+    page exists, so rendering page 1 costs the same however many posts
+    there are. paginator.count and num_pages are not available.
+    """
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        return NoCountPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+class NoCountPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
@@ -0,0 +1,57 @@
+# blog/search.py
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from .models import Post, PostSearchToken
+
+TOKEN_RE = re.compile(r'\w+')
+MAX_TOKEN_LENGTH = 100
+# A word in the title counts for more than the same word in a tag or the body.
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 2
+CONTENT_WEIGHT = 1
+
+def tokenize(text):
+    return [token[:MAX_TOKEN_LENGTH] for token in TOKEN_RE.findall(text.casefold())]
+
+def post_token_weights(title, content, tag_names):
+    weights = Counter()
+    for token in tokenize(title):
+        weights[token] += TITLE_WEIGHT
+    for name in tag_names:
+        for token in tokenize(name):
+            weights[token] += TAG_WEIGHT
+    for token in tokenize(content):
+        weights[token] += CONTENT_WEIGHT
+    return weights
+
+def index_post(post):
+    """
+    Replace the search tokens of a post. Call it after the post's tags are
+    saved, since tag names are indexed too.
+    """
+    weights = post_token_weights(post.title, post.content, [tag.name for tag in post.tags.all()])
+    with transaction.atomic():
+        PostSearchToken.objects.filter(post=post).delete()
+        PostSearchToken.objects.bulk_create([
+            PostSearchToken(post=post, token=token, weight=weight) for token, weight in weights.items()
+        ])
+
+def search_posts(query):
+    """
+    Posts containing every word of the query, best match first.
+
+    Runs off the (token, post) index only: no scan of the post table, no
+    join through the tag tables and no DISTINCT.
+    """
+    tokens = set(tokenize(query))
+    if not tokens:
+        return Post.objects.none()
+    return (
+        Post.objects.filter(search_tokens__token__in=tokens)
+        .annotate(search_score=Sum('search_tokens__weight'), matched_tokens=Count('search_tokens'))
+        .filter(matched_tokens=len(tokens))
+        .order_by('-search_score', '-pk')
+    )
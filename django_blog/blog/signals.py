@@ -0,0 +1,47 @@
+# blog/signals.py
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from taggit.models import Tag
+from .caching import LIST_VERSION, bump_versions, post_version_key, tag_version_key
+from .models import Post, Comment
+
+# Each signal replaces the version stamps of the cached pages it affects.
+
+def tag_slugs(post):
+    return list(post.tags.values_list('slug', flat=True))
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, **kwargs):
+    bump_versions(LIST_VERSION, post_version_key(instance.pk), *map(tag_version_key, tag_slugs(instance)))
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post_tags(sender, instance, **kwargs):
+    instance._cached_tag_slugs = tag_slugs(instance)
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    slugs = getattr(instance, '_cached_tag_slugs', [])
+    bump_versions(LIST_VERSION, post_version_key(instance.pk), *map(tag_version_key, slugs))
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    bump_versions(post_version_key(instance.post_id))
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def post_tags_changed(sender, instance, action, pk_set=None, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if action == 'pre_clear':
+        slugs = tag_slugs(instance)
+    else:
+        slugs = Tag.objects.filter(pk__in=pk_set or ()).values_list('slug', flat=True)
+    bump_versions(LIST_VERSION, post_version_key(instance.pk), *map(tag_version_key, slugs))
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created=False, update_fields=None, **kwargs):
+    # Listings show author usernames. Logins only touch last_login.
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    bump_versions(LIST_VERSION)
@@ -0,0 +1,39 @@
+# blog/testing.py
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin for catching N+1 regressions.
+
+    assertQueryCountConstant() seeds data in steps, requests the endpoint
+    after each step and fails if the number of SQL queries changes with the
+    amount of data, or exceeds an optional fixed budget.
+    """
+
+    def count_queries(self, url, client=None):
+        client = client or self.client
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200, f'GET {url} returned {response.status_code}')
+        return len(queries)
+
+    def assertQueryCountConstant(self, url, seed, sizes=(2, 12), max_queries=None, client=None):
+        """
+        Call seed(n) to add n more rows, then GET url (a string or a
+        callable returning one), for each cumulative size in sizes.
+        """
+        counts = []
+        seeded = 0
+        for size in sizes:
+            seed(size - seeded)
+            seeded = size
+            counts.append(self.count_queries(url() if callable(url) else url, client=client))
+
+        if len(set(counts)) > 1:
+            self.fail(f'Query count grows with data: {dict(zip(sizes, counts))} for {url() if callable(url) else url}')
+        if max_queries is not None:
+            self.assertLessEqual(counts[0], max_queries, f'Query budget of {max_queries} exceeded')
+        return counts[0]
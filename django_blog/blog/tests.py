@@ -1,3 +1,184 @@
-from django.test import TestCase
+# blog/tests.py
 
-# Create your tests here.
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from .caching import tag_version_key
+from .models import Post, Comment, PREVIEW_LENGTH
+from .search import index_post
+from .testing import QueryBudgetMixin
+
+
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+class PageQueryCountTests(QueryBudgetMixin, TestCase):
+    """
+    Query-count regression tests for the blog pages.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(title='Django tips', content='Body', author=self.author)
+        self.post.tags.add('django')
+
+    def seed_posts(self, n):
+        for _ in range(n):
+            author = User.objects.create_user(username=f'author{User.objects.count()}')
+            post = Post.objects.create(title='Django news', content='Body', author=author)
+            post.tags.add('django')
+            index_post(post)
+
+    def seed_comments(self, n):
+        Comment.objects.bulk_create([
+            Comment(post=self.post, author=self.author, content='Comment') for _ in range(n)
+        ])
+
+    def test_post_list(self):
+        self.assertQueryCountConstant(reverse('post-list'), self.seed_posts)
+
+    def test_post_detail(self):
+        self.assertQueryCountConstant(reverse('post-detail', kwargs={'pk': self.post.pk}), self.seed_comments)
+
+    def test_search(self):
+        self.assertQueryCountConstant(reverse('post-search') + '?q=django', self.seed_posts)
+
+    def test_tagged_posts(self):
+        self.assertQueryCountConstant(reverse('tagged-posts', kwargs={'tag_slug': 'django'}), self.seed_posts)
+
+
+class PostListTests(TestCase):
+    """
+    Tests for the paginated post listings.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        for i in range(12):
+            post = Post.objects.create(title=f'Post {i}', content='Body', author=self.author)
+            post.tags.add('django')
+
+    def test_pages_are_newest_first(self):
+        response = self.client.get(reverse('post-list'))
+        self.assertEqual([post.title for post in response.context['posts']], [f'Post {i}' for i in range(11, 1, -1)])
+        self.assertTrue(response.context['page_obj'].has_next())
+
+        response = self.client.get(reverse('post-list'), {'page': 2})
+        self.assertEqual([post.title for post in response.context['posts']], ['Post 1', 'Post 0'])
+        self.assertFalse(response.context['page_obj'].has_next())
+        self.assertEqual(self.client.get(reverse('post-list'), {'page': 3}).status_code, 404)
+
+    def test_tag_listing_is_paginated(self):
+        response = self.client.get(reverse('tagged-posts', kwargs={'tag_slug': 'django'}), {'page': 2})
+        self.assertEqual(len(response.context['posts']), 2)
+
+    def test_preview_is_stored_on_save(self):
+        post = Post.objects.create(title='Long', content='word ' * 100, author=self.author)
+        self.assertEqual(len(post.preview), PREVIEW_LENGTH)
+        self.assertTrue(post.preview.endswith('…'))
+
+        post.content = 'Short'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        self.assertEqual(post.preview, 'Short')
+
+
+class PageCacheTests(TestCase):
+    """
+    Tests for the anonymous page cache and its invalidation.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.post = Post.objects.create(title='Original', content='Body', author=self.author)
+        self.post.tags.add('django')
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        for url in (reverse('post-list'), reverse('post-detail', kwargs={'pk': self.post.pk}),
+                    reverse('tagged-posts', kwargs={'tag_slug': 'django'})):
+            first = self.client.get(url)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(first.content, second.content)
+
+    def test_version_keys_expire_with_the_pages(self):
+        with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            self.client.get(reverse('tagged-posts', kwargs={'tag_slug': 'no-such-tag'}))
+        set_many.assert_any_call({tag_version_key('no-such-tag'): mock.ANY}, 300)
+
+    def test_post_edit_invalidates_listings(self):
+        self.client.get(reverse('post-list'))
+        self.client.get(reverse('tagged-posts', kwargs={'tag_slug': 'django'}))
+        self.post.title = 'Edited'
+        self.post.save()
+        self.assertContains(self.client.get(reverse('post-list')), 'Edited')
+        self.assertContains(self.client.get(reverse('tagged-posts', kwargs={'tag_slug': 'django'})), 'Edited')
+
+    def test_comment_invalidates_post_detail(self):
+        url = reverse('post-detail', kwargs={'pk': self.post.pk})
+        self.assertContains(self.client.get(url), 'Comments (0)')
+        Comment.objects.create(post=self.post, author=self.author, content='First')
+        self.assertContains(self.client.get(url), 'Comments (1)')
+
+    def test_tag_change_invalidates_tag_pages(self):
+        url = reverse('tagged-posts', kwargs={'tag_slug': 'python'})
+        self.client.get(url)
+        self.post.tags.add('python')
+        self.assertContains(self.client.get(url), 'Original')
+        self.client.get(reverse('post-detail', kwargs={'pk': self.post.pk}))
+        self.post.tags.clear()
+        self.assertNotContains(self.client.get(url), 'Original')
+        self.assertNotContains(self.client.get(reverse('post-detail', kwargs={'pk': self.post.pk})), 'python')
+
+    def test_logged_in_users_get_fresh_pages(self):
+        self.client.force_login(self.author)
+        self.client.get(reverse('post-list'))
+        Post.objects.filter(pk=self.post.pk).update(title='Changed without signals')
+        self.assertContains(self.client.get(reverse('post-list')), 'Changed without signals')
+
+
+class PostSearchTests(TestCase):
+    """
+    Tests for the token-index post search.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='testpassword')
+        self.client.force_login(self.author)
+
+    def create_post(self, title, content, tags='misc'):
+        self.client.post(reverse('post-create'), {'title': title, 'content': content, 'tags': tags})
+        return Post.objects.get(title=title)
+
+    def search(self, query, **params):
+        return self.client.get(reverse('post-search'), {'q': query, **params}).context['posts']
+
+    def test_title_tag_and_content_matches_are_ranked(self):
+        self.create_post('Cooking notes', 'Mentions python once')
+        self.create_post('Weekend', 'Nothing relevant', tags='python')
+        self.create_post('Python tips', 'Body')
+
+        titles = [post.title for post in self.search('Python')]
+        self.assertEqual(titles, ['Python tips', 'Weekend', 'Cooking notes'])
+
+    def test_every_word_must_match(self):
+        self.create_post('Django tips', 'Body')
+        self.create_post('Django news', 'Body')
+        self.assertEqual([post.title for post in self.search('django tips')], ['Django tips'])
+
+    def test_update_reindexes_post(self):
+        post = self.create_post('Draft', 'Before')
+        self.client.post(reverse('post-update', kwargs={'pk': post.pk}), {'title': 'Draft', 'content': 'After', 'tags': 'misc'})
+        self.assertEqual(list(self.search('before')), [])
+        self.assertEqual(list(self.search('after')), [post])
+
+    def test_results_are_paginated(self):
+        for i in range(12):
+            post = Post.objects.create(title=f'Paged {i}', content='Body', author=self.author)
+            index_post(post)
+        response = self.client.get(reverse('post-search'), {'q': 'paged', 'page': 2})
+        self.assertEqual(len(response.context['posts']), 2)
+        self.assertEqual(response.context['paginator'].count, 12)
@@ -1,6 +1,7 @@
 # blog/views.py
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Q 
+from django.http import Http404
+from django.core.paginator import InvalidPage
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.views.generic.edit import FormMixin
 from django.contrib.auth.forms import UserCreationForm
@@ -12,6 +13,11 @@ from django.urls import reverse, reverse_lazy
 from .models import Post, Comment
 from taggit.models import Tag 
 from .forms import PostForm, CommentForm
+from .search import index_post, search_posts
+from .pagination import NoCountPaginator
+from .caching import (
+    AnonymousPageCacheMixin, cached_for_anonymous, get_page_cache_timeout, get_versions, post_version_key, tag_version_key,
+)
 
 # blog View
 def register(request):
@@ -38,25 +44,43 @@ def profile(request):
             return redirect('profile')
     return render(request, 'blog/profile.html', {'user': request.user})
 
+POSTS_PER_PAGE = 10
+
+def listed_posts():
+    # What post listings render: newest first on the (published_date, id)
+    # index, authors joined in, and the preview column instead of the body.
+    return Post.objects.select_related('author').defer('content').order_by('-published_date', '-id')
+
 # List all blog posts
-class PostListView(ListView):
+class PostListView(AnonymousPageCacheMixin, ListView):
     model = Post
     template_name = 'blog/post_list.html'
     context_object_name = 'posts'
+    paginate_by = POSTS_PER_PAGE
+    paginator_class = NoCountPaginator
+
+    def get_queryset(self):
+        return listed_posts()
 
 # View a single post
-class PostDetailView(FormMixin, DetailView):
+class PostDetailView(AnonymousPageCacheMixin, FormMixin, DetailView):
     model = Post
     template_name = 'blog/post_detail.html'
     context_object_name = 'post'
     form_class = CommentForm
 
+    def get_page_version_keys(self):
+        return (post_version_key(self.kwargs['pk']),)
+
     def get_success_url(self):
         return reverse('post-detail', kwargs={'pk': self.object.pk})
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = self.get_form()
+        # Keys the comment and tag fragments of the template.
+        context['post_version'], = get_versions(post_version_key(self.object.pk))
+        context['fragment_cache_timeout'] = get_page_cache_timeout()
         return context
 
     def post(self, request, *args, **kwargs):
@@ -72,8 +96,16 @@ class PostDetailView(FormMixin, DetailView):
             return self.form_invalid(form)
             
 
+# Keeps the search index in step with post edits
+class SearchIndexMixin:
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        # The form has saved the tags by now, so they are indexed too.
+        index_post(self.object)
+        return response
+
 # Create a new post (login required)
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(LoginRequiredMixin, SearchIndexMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/post_form.html'
@@ -84,7 +116,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 # Update an existing post (login and ownership required)
-class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class PostUpdateView(LoginRequiredMixin, UserPassesTestMixin, SearchIndexMixin, UpdateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/post_form.html'
@@ -147,31 +179,40 @@ class PostSearchView(ListView):
     model = Post
     template_name = 'blog/post_search_results.html'
     context_object_name = 'posts'
+    paginate_by = 10
 
     def get_queryset(self):
         query = self.request.GET.get('q')
         if query:
-            # Search across title, content, and tags
-            return Post.objects.filter(
-                Q(title__icontains=query) | 
-                Q(content__icontains=query) |
-                Q(tags__name__icontains=query) # <-- Search by tag name
-            ).distinct()
+            # Search across title, content, and tags through the token index
+            return search_posts(query)
         return Post.objects.none()
 
 def tagged_posts_view(request, tag_slug):
-    tag = get_object_or_404(Tag, slug=tag_slug)
-    posts = Post.objects.filter(tags__in=[tag])
-    return render(request, 'blog/tagged_posts.html', {'posts': posts, 'tag': tag})
+    return cached_for_anonymous(request, (tag_version_key(tag_slug),), lambda: render_tagged_posts(request, tag_slug))
 
-class PostByTagListView(ListView):
+def render_tagged_posts(request, tag_slug):
+    tag = get_object_or_404(Tag, slug=tag_slug)
+    paginator = NoCountPaginator(listed_posts().filter(tags=tag), POSTS_PER_PAGE)
+    try:
+        page_obj = paginator.page(request.GET.get('page') or 1)
+    except InvalidPage:
+        raise Http404('Invalid page.')
+    return render(request, 'blog/tagged_posts.html', {'posts': page_obj.object_list, 'tag': tag, 'page_obj': page_obj})
+
+class PostByTagListView(AnonymousPageCacheMixin, ListView):
     model = Post
     template_name = 'blog/tagged_posts.html'
     context_object_name = 'posts'
+    paginate_by = POSTS_PER_PAGE
+    paginator_class = NoCountPaginator
+
+    def get_page_version_keys(self):
+        return (tag_version_key(self.kwargs['tag_slug']),)
 
     def get_queryset(self):
         self.tag = get_object_or_404(Tag, slug=self.kwargs['tag_slug'])
-        return Post.objects.filter(tags=self.tag)
+        return listed_posts().filter(tags=self.tag)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -131,4 +131,10 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-LOGIN_URL = '/login/'
\ No newline at end of file
+LOGIN_URL = '/login/'
+
+# Anonymous page views and post detail fragments are cached for this many
+# seconds, under version stamps that edits replace (blog/caching.py). With
+# several server processes, configure a shared cache such as Redis or
+# Memcached in CACHES, so every process sees the new stamps at once.
+BLOG_PAGE_CACHE_TIMEOUT = 300
@@ -0,0 +1,113 @@
+# accounts/follows.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from social_media_api.inserts import insert_ignoring_conflicts
+from .models import CustomUser
+
+# Rows of this table mean "to_customuser follows from_customuser",
+# since CustomUser.followers is declared on the account being followed.
+Follow = CustomUser.followers.through
+
+
+def follow_cache_key(user_id, target_id):
+    return f'accounts:follows:{user_id}:{target_id}'
+
+
+def cache_follow(user_id, target_id, following):
+    cache.set(follow_cache_key(user_id, target_id), following, getattr(settings, 'FOLLOW_CACHE_TIMEOUT', 300))
+
+
+def is_following(user, target):
+    """
+    Return whether user follows target, answering from the cache when possible.
+    """
+    key = follow_cache_key(user.pk, target.pk)
+    following = cache.get(key)
+    if following is None:
+        following = Follow.objects.filter(from_customuser_id=target.pk, to_customuser_id=user.pk).exists()
+        cache_follow(user.pk, target.pk, following)
+    return following
+
+
+def follow(user, target):
+    """
+    Make user follow target. Returns False if user already followed target.
+    """
+    try:
+        # The row and both counters change together or not at all.
+        with transaction.atomic():
+            Follow.objects.create(from_customuser_id=target.pk, to_customuser_id=user.pk)
+            CustomUser.objects.filter(pk=target.pk).update(follower_count=F('follower_count') + 1)
+            CustomUser.objects.filter(pk=user.pk).update(following_count=F('following_count') + 1)
+    except IntegrityError:
+        cache_follow(user.pk, target.pk, True)
+        return False
+
+    cache_follow(user.pk, target.pk, True)
+    return True
+
+
+def unfollow(user, target):
+    """
+    Make user stop following target. Returns False if user did not follow target.
+    """
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(from_customuser_id=target.pk, to_customuser_id=user.pk).delete()
+        if deleted:
+            # Never below zero, even if the counters have drifted.
+            CustomUser.objects.filter(pk=target.pk).update(follower_count=Greatest(F('follower_count') - 1, 0))
+            CustomUser.objects.filter(pk=user.pk).update(following_count=Greatest(F('following_count') - 1, 0))
+    cache_follow(user.pk, target.pk, False)
+    return bool(deleted)
+
+
+def bulk_follow(user, target_ids):
+    """
+    Make user follow every account in target_ids with one INSERT.
+
+    Returns (followed, already_following, not_found) lists of ids. The user's
+    own id is reported as not found. Accounts followed before, or by a
+    concurrent request, count as already followed; the counters only move
+    for rows this call inserted. Runs a fixed number of queries however many
+    ids are given.
+    """
+    target_ids = list(dict.fromkeys(target_ids))
+    found = set(CustomUser.objects.filter(pk__in=target_ids).exclude(pk=user.pk).values_list('pk', flat=True))
+
+    with transaction.atomic():
+        inserted = set(insert_ignoring_conflicts(
+            Follow,
+            [{'from_customuser_id': pk, 'to_customuser_id': user.pk} for pk in target_ids if pk in found],
+            returning='from_customuser_id',
+        ))
+        if inserted:
+            CustomUser.objects.filter(pk__in=inserted).update(follower_count=F('follower_count') + 1)
+            CustomUser.objects.filter(pk=user.pk).update(following_count=F('following_count') + len(inserted))
+    cache.set_many(
+        {follow_cache_key(user.pk, pk): True for pk in found},
+        getattr(settings, 'FOLLOW_CACHE_TIMEOUT', 300),
+    )
+
+    return (
+        [pk for pk in target_ids if pk in inserted],
+        [pk for pk in target_ids if pk in found and pk not in inserted],
+        [pk for pk in target_ids if pk not in found],
+    )
+
+
+def follow_count_subquery(through, field):
+    """
+    Subquery counting the follow rows whose `field` is the outer user.
+    """
+    counts = (
+        through.objects.filter(**{f'{field}_id': OuterRef('pk')})
+        .order_by()
+        .values(f'{field}_id')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
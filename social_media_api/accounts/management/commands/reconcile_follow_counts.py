@@ -0,0 +1,16 @@
+# accounts/management/commands/reconcile_follow_counts.py
+
+from django.core.management.base import BaseCommand
+from accounts.follows import Follow, follow_count_subquery
+from accounts.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'Recompute CustomUser.follower_count and following_count from the follow table.'
+
+    def handle(self, *args, **options):
+        updated = CustomUser.objects.update(
+            follower_count=follow_count_subquery(Follow, 'from_customuser'),
+            following_count=follow_count_subquery(Follow, 'to_customuser'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Reconciled follow counters on {updated} users.'))
@@ -0,0 +1,15 @@
+# accounts/management/commands/refresh_follow_suggestions.py
+
+from django.core.management.base import BaseCommand
+from accounts.suggestions import refresh_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored "who to follow" suggestions from the follow graph.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Users replaced per transaction.')
+
+    def handle(self, *args, **options):
+        written = refresh_suggestions(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} follow suggestions.'))
@@ -12,4 +12,35 @@ class CustomUser(AbstractUser):
         related_name='following',
         blank=True
     )
-    # The 'related_name' 'following' means you can access who a user is following with 'user.following.all()'
\ No newline at end of file
+    # The 'related_name' 'following' means you can access who a user is following with 'user.following.all()'
+
+    # Set once the account has more followers than settings.FEED_FANOUT_LIMIT.
+    # Posts by these authors are not copied into follower feeds; they are
+    # merged in when the feed is read instead (see posts/feed.py).
+    fanout_on_read = models.BooleanField(default=False)
+
+    # Denormalized sizes of the follow graph, kept in step by accounts/follows.py.
+    # Run 'manage.py reconcile_follow_counts' to repair drift.
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
+class FollowSuggestion(models.Model):
+    """
+    A precomputed "who to follow" candidate: an account followed by
+    `mutual_count` of the accounts the user follows.
+
+    Rows are replaced wholesale by 'manage.py refresh_follow_suggestions',
+    so reading suggestions never walks the follow graph.
+    """
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='follow_suggestions')
+    candidate = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='+')
+    mutual_count = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'candidate'], name='accounts_suggestion_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-mutual_count'], name='accounts_suggestion_rank_idx'),
+        ]
@@ -3,7 +3,8 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from rest_framework.authtoken.models import Token
-from .models import CustomUser
+from .models import CustomUser, FollowSuggestion
+from social_media_api.eager_loading import EagerLoadingMixin
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, style={'input_type': 'password'})
@@ -30,7 +31,27 @@ class UserLoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
 class UserProfileSerializer(serializers.ModelSerializer):
+    # Counts instead of the follower id list, which is unbounded for popular
+    # accounts. The ids themselves are paged by the followers/ endpoint.
     class Meta:
         model = CustomUser
-        fields = ('username', 'email', 'bio', 'profile_picture', 'followers')
-        read_only_fields = ('username', 'email', 'followers')
+        fields = ('username', 'email', 'bio', 'profile_picture', 'follower_count', 'following_count')
+        read_only_fields = ('username', 'email', 'follower_count', 'following_count')
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomUser
+        fields = ('id', 'username', 'profile_picture')
+        read_only_fields = fields
+
+class BulkFollowSerializer(serializers.Serializer):
+    user_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
+
+class FollowSuggestionSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    id = serializers.ReadOnlyField(source='candidate.id')
+    username = serializers.ReadOnlyField(source='candidate.username')
+    profile_picture = serializers.ImageField(source='candidate.profile_picture', read_only=True)
+
+    class Meta:
+        model = FollowSuggestion
+        fields = ('id', 'username', 'profile_picture', 'mutual_count')
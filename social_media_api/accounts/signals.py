@@ -0,0 +1,22 @@
+# accounts/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from social_media_api.authentication import invalidate_tokens
+from .models import CustomUser
+
+
+@receiver(post_delete, sender=Token)
+def drop_deleted_token(sender, instance, **kwargs):
+    # Logout and token rotation both delete the old token.
+    invalidate_tokens([instance.key])
+
+
+@receiver(post_save, sender=CustomUser)
+def drop_tokens_of_saved_user(sender, instance, created=False, update_fields=None, **kwargs):
+    # A password change, deactivation or profile edit must not be masked by a
+    # cached copy of the user. Logins only touch last_login, which is skipped.
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    invalidate_tokens(Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
@@ -0,0 +1,72 @@
+# accounts/suggestions.py
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .follows import Follow
+from .models import FollowSuggestion
+
+
+def get_suggestion_limit():
+    # How many suggestions are stored per user.
+    return getattr(settings, 'FOLLOW_SUGGESTION_LIMIT', 20)
+
+
+def load_following_graph():
+    """
+    Read the whole follow table once and return {user id: set of followed ids}.
+    """
+    following = defaultdict(set)
+    rows = Follow.objects.order_by().values_list('to_customuser_id', 'from_customuser_id')
+    for follower_id, followed_id in rows.iterator(chunk_size=10000):
+        following[follower_id].add(followed_id)
+    return following
+
+
+def friends_of_friends(user_id, following, limit):
+    """
+    Rank the accounts followed by the accounts user_id follows, by how many of
+    them follow each candidate. Accounts already followed are left out.
+    """
+    followed = following.get(user_id, set())
+    counts = Counter()
+    for friend_id in followed:
+        counts.update(following.get(friend_id, ()))
+    for excluded in followed | {user_id}:
+        counts.pop(excluded, None)
+    # Ties go to the lower id so refreshes are stable.
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def refresh_suggestions(batch_size=500):
+    """
+    Recompute FollowSuggestion rows for every user who follows someone.
+
+    The follow graph is read into memory in a single pass and the multi-hop
+    walk happens in Python, so the database only sees one sequential read and
+    batched writes. Each batch of users is replaced in its own transaction.
+    Returns the number of suggestions written.
+    """
+    following = load_following_graph()
+    limit = get_suggestion_limit()
+    computed_at = timezone.now()
+    user_ids = sorted(following)
+    written = 0
+
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        rows = [
+            FollowSuggestion(user_id=user_id, candidate_id=candidate_id, mutual_count=mutual_count, computed_at=computed_at)
+            for user_id in batch
+            for candidate_id, mutual_count in friends_of_friends(user_id, following, limit)
+        ]
+        with transaction.atomic():
+            FollowSuggestion.objects.filter(user_id__in=batch).delete()
+            FollowSuggestion.objects.bulk_create(rows, batch_size=batch_size)
+        written += len(rows)
+
+    # Users who no longer follow anyone have nothing to be suggested from.
+    FollowSuggestion.objects.filter(computed_at__lt=computed_at).delete()
+    return written
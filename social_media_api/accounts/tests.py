@@ -1,3 +1,294 @@
-from django.test import TestCase
+# accounts/tests.py
 
-# Create your tests here.
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, identify_hasher, make_password
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from posts.models import Post, FeedEntry
+from social_media_api.authentication import CachedTokenAuthentication, get_cached_auth, shared_cache_key, token_cache
+from . import follows
+from .follows import follow, is_following
+from .hashers import TunedScryptPasswordHasher
+from .models import FollowSuggestion
+from .throttling import LoginRateThrottle
+
+User = get_user_model()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class FollowTests(APITestCase):
+    """
+    Tests for following, the follow counters and the follower lists.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.celebrity = User.objects.create_user(username='celebrity')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+        self.follow_url = reverse('follow-unfollow', kwargs={'user_id': self.celebrity.pk})
+
+    def test_follow_and_unfollow_update_counts(self):
+        self.client.post(self.follow_url)
+        self.celebrity.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual((self.celebrity.follower_count, self.user.following_count), (1, 1))
+        self.assertTrue(is_following(self.user, self.celebrity))
+
+        self.client.post(self.follow_url)
+        self.celebrity.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual((self.celebrity.follower_count, self.user.following_count), (0, 0))
+        self.assertFalse(is_following(self.user, self.celebrity))
+
+    def test_unfollow_does_not_take_drifted_counts_below_zero(self):
+        self.celebrity.followers.add(self.user)
+        self.client.post(self.follow_url)
+        self.celebrity.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual((self.celebrity.follower_count, self.user.following_count), (0, 0))
+        self.assertFalse(is_following(self.user, self.celebrity))
+
+    def test_follow_check_is_cached(self):
+        is_following(self.user, self.celebrity)
+        with self.assertNumQueries(0):
+            self.assertFalse(is_following(self.user, self.celebrity))
+
+    def test_profile_returns_counts_not_ids(self):
+        self.client.post(self.follow_url)
+        response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('followers', response.data)
+        self.assertEqual(response.data['following_count'], 1)
+
+    def test_follower_list_is_paginated(self):
+        for i in range(3):
+            self.celebrity.followers.add(User.objects.create_user(username=f'fan{i}'))
+        response = self.client.get(reverse('user-followers', kwargs={'user_id': self.celebrity.pk}), {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual([fan['username'] for fan in response.data['results']], ['fan0'])
+
+    def test_reconcile_follow_counts(self):
+        self.celebrity.followers.add(self.user)
+        call_command('reconcile_follow_counts', stdout=StringIO())
+        self.celebrity.refresh_from_db()
+        self.user.refresh_from_db()
+        self.assertEqual((self.celebrity.follower_count, self.user.following_count), (1, 1))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class BulkFollowTests(APITestCase):
+    """
+    Tests for the bulk follow endpoint.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='newcomer')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+        self.url = reverse('follow-bulk')
+
+    def test_bulk_follow(self):
+        known, new = User.objects.create_user(username='known'), User.objects.create_user(username='new')
+        known.followers.add(self.user)
+        Post.objects.create(author=new, title='Recent', content='Body')
+
+        response = self.client.post(self.url, {'user_ids': [known.pk, new.pk, self.user.pk, 9999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['followed'], [new.pk])
+        self.assertEqual(response.data['already_following'], [known.pk])
+        self.assertEqual(response.data['not_found'], [self.user.pk, 9999])
+
+        new.refresh_from_db()
+        self.assertEqual(new.follower_count, 1)
+        self.assertTrue(is_following(self.user, new))
+        self.assertTrue(FeedEntry.objects.filter(owner=self.user, author=new).exists())
+
+    def test_concurrent_and_repeated_bulk_follows_keep_counts_exact(self):
+        first, second = User.objects.create_user(username='first'), User.objects.create_user(username='second')
+        real_insert = follows.insert_ignoring_conflicts
+
+        def insert_after_concurrent_follow(*args, **kwargs):
+            # Another request follows an account between the lookup and the insert.
+            follow(self.user, first)
+            return real_insert(*args, **kwargs)
+
+        with mock.patch.object(follows, 'insert_ignoring_conflicts', insert_after_concurrent_follow):
+            response = self.client.post(self.url, {'user_ids': [first.pk, second.pk]}, format='json')
+        self.assertEqual(response.data['followed'], [second.pk])
+        self.assertEqual(response.data['already_following'], [first.pk])
+
+        response = self.client.post(self.url, {'user_ids': [first.pk, second.pk]}, format='json')
+        self.assertEqual(response.data['followed'], [])
+
+        for account in (self.user, first, second):
+            account.refresh_from_db()
+        self.assertEqual(self.user.following_count, 2)
+        self.assertEqual((first.follower_count, second.follower_count), (1, 1))
+
+    def test_query_count_does_not_grow(self):
+        targets = [User.objects.create_user(username=f'target{i}') for i in range(30)]
+        self.client.get(reverse('profile'))  # warm the token cache
+        query_counts = []
+        for batch in (targets[:2], targets[2:]):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(self.url, {'user_ids': [target.pk for target in batch]}, format='json')
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class FollowSuggestionTests(APITestCase):
+    """
+    Tests for the precomputed friends-of-friends suggestions.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='user')
+        self.friends = [User.objects.create_user(username=f'friend{i}') for i in range(2)]
+        self.popular = User.objects.create_user(username='popular')
+        self.niche = User.objects.create_user(username='niche')
+        for friend in self.friends:
+            friend.followers.add(self.user)
+            self.popular.followers.add(friend)
+        self.niche.followers.add(self.friends[0])
+        # Already followed accounts are never suggested.
+        self.friends[1].followers.add(self.friends[0])
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+
+    def test_suggestions_are_ranked_by_mutual_follows(self):
+        call_command('refresh_follow_suggestions', stdout=StringIO())
+        response = self.client.get(reverse('follow-suggestions'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['username'], row['mutual_count']) for row in response.data],
+            [('popular', 2), ('niche', 1)],
+        )
+
+    def test_followed_since_refresh_are_hidden(self):
+        call_command('refresh_follow_suggestions', stdout=StringIO())
+        self.popular.followers.add(self.user)
+        response = self.client.get(reverse('follow-suggestions'))
+        self.assertEqual([row['username'] for row in response.data], ['niche'])
+
+    def test_refresh_replaces_stale_rows(self):
+        call_command('refresh_follow_suggestions', stdout=StringIO())
+        for friend in self.friends:
+            friend.followers.remove(self.user)
+        call_command('refresh_follow_suggestions', stdout=StringIO())
+        self.assertFalse(FollowSuggestion.objects.filter(user=self.user).exists())
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class TokenCacheTests(APITestCase):
+    """
+    Tests for CachedTokenAuthentication and its invalidation.
+    """
+
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username='user', password='old-password')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.url = reverse('notification-unread-count')
+
+    def test_warm_request_skips_token_query(self):
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertFalse(any('authtoken_token' in query['sql'] for query in queries))
+
+    def test_logout_invalidates_token(self):
+        self.client.get(self.url)
+        self.assertEqual(self.client.post(reverse('logout')).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_password_change_and_deactivation_invalidate_token(self):
+        self.client.get(self.url)
+        self.user.set_password('new-password')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_cached_user_is_copied_per_request(self):
+        self.client.get(self.url)
+        (first_user, first_token), (second_user, second_token) = get_cached_auth(self.token.key), get_cached_auth(self.token.key)
+        self.assertIsNot(first_user, second_user)
+        self.assertIsNot(first_token, second_token)
+
+    def test_auth_is_always_the_token(self):
+        authentication = CachedTokenAuthentication()
+        for _ in ('cold', 'warm'):
+            user, auth = authentication.authenticate_credentials(self.token.key)
+            self.assertIsInstance(auth, Token)
+            self.assertEqual(auth.created, self.token.created)
+            self.assertEqual(auth.user, user)
+
+    @override_settings(
+        CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'tokens': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tokens'},
+        },
+        TOKEN_AUTH_CACHE_ALIAS='tokens',
+    )
+    def test_shared_tier_holds_only_the_user_id_and_revokes_everywhere(self):
+        self.client.get(self.url)
+        shared = caches['tokens']
+        self.assertEqual(shared.get(shared_cache_key(self.token.key)), self.user.pk)
+
+        # Another process invalidates the token: this one's local entry no
+        # longer counts, so the next request reads the database again.
+        shared.delete(shared_cache_key(self.token.key))
+        self.assertIsNone(get_cached_auth(self.token.key))
+        Token.objects.filter(pk=self.token.pk).update(key='rotated')
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class LoginTests(APITestCase):
+    """
+    Tests for password rehashing and login throttling.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='user')
+        self.url = reverse('login')
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        self.user.password = make_password('secret-password', hasher='pbkdf2_sha256')
+        self.user.save()
+
+        response = self.client.post(self.url, {'username': 'user', 'password': 'secret-password'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.user.password).algorithm, get_hasher().algorithm)
+
+    @override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 12)
+    def test_cost_change_is_applied_on_login(self):
+        self.user.password = make_password('secret-password', hasher=TunedScryptPasswordHasher())
+        self.user.save()
+        with override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 13):
+            self.client.post(self.url, {'username': 'user', 'password': 'secret-password'}, format='json')
+            self.user.refresh_from_db()
+            self.assertFalse(TunedScryptPasswordHasher().must_update(self.user.password))
+
+    @mock.patch.object(LoginRateThrottle, 'THROTTLE_RATES', {'login': '2/min'})
+    def test_login_flood_is_throttled_before_hashing(self):
+        for _ in range(2):
+            self.client.post(self.url, {'username': 'user', 'password': 'wrong'}, format='json')
+        with mock.patch('accounts.views.authenticate') as authenticate:
+            response = self.client.post(self.url, {'username': 'user', 'password': 'wrong'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        authenticate.assert_not_called()
@@ -0,0 +1,22 @@
+# accounts/throttling.py
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class ClientIPRateThrottle(SimpleRateThrottle):
+    """
+    Limits requests per client IP, whether or not the request carries
+    credentials. Views using it should not authenticate, so a flood is
+    rejected before any password is hashed.
+    """
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginRateThrottle(ClientIPRateThrottle):
+    scope = 'login'
+
+
+class RegisterRateThrottle(ClientIPRateThrottle):
+    scope = 'register'
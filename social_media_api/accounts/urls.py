@@ -1,12 +1,20 @@
 # accounts/urls.py
 
 from django.urls import path
-from .views import RegisterView, LoginView, UserProfileView, FollowUnfollowView
+from .views import (
+    RegisterView, LoginView, LogoutView, UserProfileView, FollowUnfollowView, FollowerListView, FollowingListView,
+    BulkFollowView, FollowSuggestionListView,
+)
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
+    path('logout/', LogoutView.as_view(), name='logout'),
     path('profile/', UserProfileView.as_view(), name='profile'),
     path('follow/<int:user_id>/', FollowUnfollowView.as_view(), name='follow-unfollow'),
+    path('follow/bulk/', BulkFollowView.as_view(), name='follow-bulk'),
     path('unfollow/<int:user_id>/', FollowUnfollowView.as_view(), name='follow-unfollow'),
+    path('<int:user_id>/followers/', FollowerListView.as_view(), name='user-followers'),
+    path('<int:user_id>/following/', FollowingListView.as_view(), name='user-following'),
+    path('suggestions/', FollowSuggestionListView.as_view(), name='follow-suggestions'),
 ]
\ No newline at end of file
@@ -3,16 +3,26 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
-from rest_framework.permissions import permissions.IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from rest_framework import permissions
 from django.contrib.auth import authenticate
 from django.shortcuts import get_object_or_404
-from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer
-from .models import CustomUser
+from .serializers import (
+    UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer, UserSummarySerializer,
+    BulkFollowSerializer, FollowSuggestionSerializer,
+)
+from .models import CustomUser, FollowSuggestion
+from .suggestions import get_suggestion_limit
+from .throttling import LoginRateThrottle, RegisterRateThrottle
+from .follows import follow, unfollow, is_following, bulk_follow
+from posts.feed import backfill_feed, backfill_feeds, remove_from_feed
+from social_media_api.authentication import CachedTokenAuthentication
+from social_media_api.pagination import UserCursorPagination
 
 class RegisterView(generics.CreateAPIView):
     queryset = CustomUser.objects.all()
     serializer_class = UserRegistrationSerializer
+    authentication_classes = []
+    throttle_classes = [RegisterRateThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -24,6 +34,10 @@ class RegisterView(generics.CreateAPIView):
 
 class LoginView(generics.GenericAPIView):
     serializer_class = UserLoginSerializer
+    # No authentication classes: Basic auth would hash a password before
+    # the throttle gets to reject the request.
+    authentication_classes = []
+    throttle_classes = [LoginRateThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -38,38 +52,115 @@ class LoginView(generics.GenericAPIView):
             return Response({'error': 'Invalid credentials'}, status=status.HTTP_400_BAD_REQUEST)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class LogoutView(generics.GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        # Deleting the token also drops it from the token cache (accounts/signals.py).
+        Token.objects.filter(user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserProfileSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user may come from the token cache, so the counters on it
+        # can be a little behind; read the row itself.
+        return CustomUser.objects.get(pk=self.request.user.pk)
 
 class FollowUnfollowView(generics.GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
-    def post(self, request, pk):
+    def post(self, request, user_id):
         try:
-            user_to_follow = CustomUser.objects.get(pk=pk)
+            user_to_follow = CustomUser.objects.get(pk=user_id)
         except CustomUser.DoesNotExist:
             return Response({"error": "User not found."}, status=status.HTTP_404_NOT_FOUND)
 
         if request.user == user_to_follow:
             return Response({"error": "You cannot follow yourself."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Check if the user is already following the target user
-        is_following = request.user.following.filter(pk=user_to_follow.pk).exists()
-
-        if is_following:
+        # Check if the user is already following the target user (cached)
+        if is_following(request.user, user_to_follow):
             # Unfollow the user
-            request.user.following.remove(user_to_follow)
+            if unfollow(request.user, user_to_follow):
+                remove_from_feed(request.user, user_to_follow)
             message = f"You have unfollowed {user_to_follow.username}."
         else:
             # Follow the user
-            request.user.following.add(user_to_follow)
+            if follow(request.user, user_to_follow):
+                backfill_feed(request.user, user_to_follow)
             message = f"You are now following {user_to_follow.username}."
 
         return Response({"message": message}, status=status.HTTP_200_OK)
 
+
+class FollowerListView(generics.ListAPIView):
+    """
+    Paginated list of the accounts following a user.
+    """
+    serializer_class = UserSummarySerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UserCursorPagination
+
+    def get_queryset(self):
+        user = get_object_or_404(CustomUser.objects.only('id'), pk=self.kwargs['user_id'])
+        return CustomUser.objects.filter(following=user).only('id', 'username', 'profile_picture')
+
+class FollowingListView(FollowerListView):
+    """
+    Paginated list of the accounts a user follows.
+    """
+    def get_queryset(self):
+        user = get_object_or_404(CustomUser.objects.only('id'), pk=self.kwargs['user_id'])
+        return CustomUser.objects.filter(followers=user).only('id', 'username', 'profile_picture')
+
+
+class BulkFollowView(generics.GenericAPIView):
+    """
+    Follow many accounts in one request, e.g. when importing contacts.
+
+    Runs a fixed number of queries regardless of how many ids are sent.
+    Unknown ids and accounts that are already followed are skipped.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = BulkFollowSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        followed, already_following, not_found = bulk_follow(request.user, serializer.validated_data['user_ids'])
+        if followed:
+            backfill_feeds(request.user, followed)
+        return Response({
+            'followed': followed,
+            'already_following': already_following,
+            'not_found': not_found,
+        }, status=status.HTTP_200_OK)
+
+class FollowSuggestionListView(generics.ListAPIView):
+    """
+    Accounts followed by the people the user follows, best match first.
+
+    Served from the FollowSuggestion snapshot written by
+    'manage.py refresh_follow_suggestions'; accounts followed since the last
+    refresh are filtered out.
+    """
+    serializer_class = FollowSuggestionSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        suggestions = (
+            FollowSuggestion.objects.filter(user=self.request.user)
+            .exclude(candidate__followers=self.request.user)
+            .order_by('-mutual_count', 'candidate_id')
+        )
+        return FollowSuggestionSerializer.setup_eager_loading(suggestions)[:get_suggestion_limit()]
@@ -0,0 +1,198 @@
+# notifications/dispatch.py
+
+import atexit
+import logging
+import queue
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .models import Notification
+from .pubsub import get_broker
+from .serializers import NotificationSerializer
+from .unread import invalidate_unread_count
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_ACTOR_COUNT = 3
+
+
+def coalesce_key(notification):
+    return (notification.recipient_id, notification.verb, notification.content_type_id, notification.object_id)
+
+
+def sample_actors(usernames):
+    # Most recent first, without duplicates.
+    return list(dict.fromkeys(usernames))[:SAMPLE_ACTOR_COUNT]
+
+
+def publish_notifications(notifications):
+    # Only recipients with an open stream are worth serializing for.
+    broker = get_broker()
+    for notification in notifications:
+        if broker.has_subscribers(notification.recipient_id):
+            broker.publish(notification.recipient_id, NotificationSerializer(notification).data)
+
+
+def write_notifications(notifications, batch_size=500):
+    """
+    Store unsaved Notification instances, merging events that share a
+    recipient, verb and target with each other and with any matching row
+    written inside settings.NOTIFICATIONS_COALESCE_WINDOW seconds.
+
+    Runs a fixed number of queries per call: one lookup of rows to merge
+    into, one bulk_update and one bulk_create, and none when publishing
+    after commit. The actor of every notification must be loaded, since its
+    username is stored in the sample. Rows being merged into are locked
+    until the commit, so concurrent writers add to actor_count in turn
+    instead of overwriting each other's counts.
+    """
+    # One transaction, so the rows are written all or nothing and the
+    # on_commit callbacks run after them even when called in autocommit, as
+    # the dispatcher's worker does.
+    with transaction.atomic():
+        # After commit, or a badge poll in between would cache the old count again.
+        recipient_ids = {notification.recipient_id for notification in notifications}
+        transaction.on_commit(lambda: invalidate_unread_count(recipient_ids))
+
+        window = getattr(settings, 'NOTIFICATIONS_COALESCE_WINDOW', 0)
+        if not window:
+            for notification in notifications:
+                notification.sample_actors = [notification.actor.username]
+            Notification.objects.bulk_create(notifications, batch_size=batch_size)
+            transaction.on_commit(lambda: publish_notifications(notifications))
+            return
+
+        groups = {}
+        for notification in notifications:
+            groups.setdefault(coalesce_key(notification), []).append(notification)
+
+        now = timezone.now()
+        existing = {}
+        candidates = Notification.objects.filter(
+            recipient_id__in={key[0] for key in groups},
+            content_type_id__in={key[2] for key in groups},
+            object_id__in={key[3] for key in groups},
+            timestamp__gte=now - timedelta(seconds=window),
+        ).select_related('actor', 'content_type').select_for_update(of=('self',)).order_by('timestamp')
+        for candidate in candidates:
+            key = coalesce_key(candidate)
+            if key in groups:
+                existing[key] = candidate  # later rows win, so the newest is kept
+
+        to_create, to_update = [], []
+        for key, group in groups.items():
+            latest = group[-1]
+            usernames = [notification.actor.username for notification in reversed(group)]
+            merged = existing.get(key)
+            if merged is None:
+                latest.actor_count = len(group)
+                latest.sample_actors = sample_actors(usernames)
+                to_create.append(latest)
+            else:
+                merged.actor = latest.actor
+                merged.actor_count += len(group)
+                merged.sample_actors = sample_actors(usernames + merged.sample_actors)
+                merged.timestamp = now
+                merged.is_read = False
+                to_update.append(merged)
+
+        if to_update:
+            Notification.objects.bulk_update(
+                to_update, ['actor', 'actor_count', 'sample_actors', 'timestamp', 'is_read'], batch_size=batch_size
+            )
+        if to_create:
+            Notification.objects.bulk_create(to_create, batch_size=batch_size)
+        transaction.on_commit(lambda: publish_notifications(to_update + to_create))
+
+
+class NotificationDispatcher:
+    """
+    Buffers unsaved Notification instances in memory and writes them with
+    bulk_create from a background thread, so request handlers never wait on
+    the notifications table.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=1.0):
+        self.queue = queue.Queue()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, notifications):
+        for notification in notifications:
+            self.queue.put(notification)
+        self._ensure_worker()
+
+    def flush(self):
+        """
+        Write everything queued so far from the calling thread.
+        """
+        while True:
+            batch = self._take_batch(block=False)
+            if not batch:
+                return
+            self._write(batch)
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='notification-dispatcher', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(block=True)
+            if batch:
+                close_old_connections()
+                self._write(batch)
+
+    def _take_batch(self, block):
+        try:
+            batch = [self.queue.get(block=block, timeout=self.flush_interval if block else None)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            write_notifications(batch, batch_size=self.batch_size)
+        except Exception:
+            logger.exception('Failed to write %d notifications.', len(batch))
+
+
+dispatcher = NotificationDispatcher(
+    batch_size=getattr(settings, 'NOTIFICATIONS_BATCH_SIZE', 500),
+    flush_interval=getattr(settings, 'NOTIFICATIONS_FLUSH_INTERVAL', 1.0),
+)
+atexit.register(dispatcher.flush)
+
+
+def send(notifications):
+    """
+    Deliver unsaved Notification instances.
+
+    With NOTIFICATIONS_ASYNC enabled they are handed to the dispatcher once
+    the current transaction commits; otherwise they are written right away.
+    """
+    notifications = list(notifications)
+    if not notifications:
+        return
+    if getattr(settings, 'NOTIFICATIONS_ASYNC', False):
+        transaction.on_commit(lambda: dispatcher.enqueue(notifications))
+    else:
+        write_notifications(notifications)
+
+
+def notify(recipient_id, actor, verb, target):
+    send([Notification(recipient_id=recipient_id, actor=actor, verb=verb, target=target)])
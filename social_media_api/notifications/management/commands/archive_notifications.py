@@ -0,0 +1,48 @@
+# notifications/management/commands/archive_notifications.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from notifications.models import Notification, ArchivedNotification
+
+ARCHIVED_FIELDS = ['id', 'recipient_id', 'actor_id', 'verb', 'content_type_id', 'object_id', 'actor_count', 'timestamp']
+
+
+class Command(BaseCommand):
+    help = 'Move read notifications older than the retention period into the archive table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'NOTIFICATIONS_RETENTION_DAYS', 30),
+            help='Archive read notifications older than this many days.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows moved per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows would be archived.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        expired = Notification.objects.filter(is_read=True, timestamp__lt=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f'{expired.count()} notifications would be archived.')
+            return
+
+        # Each batch is its own short transaction so the hot table is never
+        # locked for long and an interrupted run can simply be restarted.
+        archived = 0
+        while True:
+            with transaction.atomic():
+                rows = list(expired.order_by('timestamp').values(*ARCHIVED_FIELDS)[:options['batch_size']])
+                if not rows:
+                    break
+                ArchivedNotification.objects.bulk_create(
+                    [ArchivedNotification(**row) for row in rows],
+                    ignore_conflicts=True,
+                )
+                Notification.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            archived += len(rows)
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} notifications older than {cutoff:%Y-%m-%d}.'))
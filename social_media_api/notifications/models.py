@@ -17,8 +17,47 @@ class Notification(models.Model):
     object_id = models.PositiveIntegerField()
     target = GenericForeignKey('content_type', 'object_id')
 
+    # Events with the same recipient, verb and target inside
+    # settings.NOTIFICATIONS_COALESCE_WINDOW are merged into one row:
+    # actor is the latest actor, actor_count the number of merged events and
+    # sample_actors the usernames of the most recent few actors.
+    actor_count = models.PositiveIntegerField(default=1)
+    sample_actors = models.JSONField(default=list, blank=True)
+
     class Meta:
         ordering = ('-timestamp',)
+        indexes = [
+            # Backs keyset pagination of a recipient's list on (timestamp, id).
+            models.Index(fields=['recipient', '-timestamp', '-id'], name='notif_recipient_ts_id_idx'),
+            # Finds the row an incoming event should be merged into.
+            models.Index(fields=['recipient', 'content_type', 'object_id', '-timestamp'], name='notif_coalesce_idx'),
+            # Partial index over unread rows only, for the unread badge and mark-read.
+            models.Index(fields=['recipient', 'id'], condition=models.Q(is_read=False), name='notif_unread_idx'),
+            # Lets the retention command find old read rows without a full scan.
+            models.Index(fields=['timestamp'], condition=models.Q(is_read=True), name='notif_read_ts_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.actor.username} {self.verb} {self.target} for {self.recipient.username}'
+
+class ArchivedNotification(models.Model):
+    # Compact copy of a read notification moved out of the hot table by
+    # 'manage.py archive_notifications'. Keeps the original id; drops the
+    # columns only needed while a notification is live.
+    id = models.BigIntegerField(primary_key=True)
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    actor = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    verb = models.CharField(max_length=255)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name='+')
+    object_id = models.PositiveIntegerField()
+    actor_count = models.PositiveIntegerField(default=1)
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-timestamp'], name='notif_archive_recipient_idx'),
+        ]
 
     def __str__(self):
-        return f'{self.actor.username} {self.verb} {self.target} for {self.recipient.username}'
\ No newline at end of file
+        return f'Archived notification {self.id} for {self.recipient_id}'
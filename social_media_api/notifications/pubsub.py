@@ -0,0 +1,80 @@
+# notifications/pubsub.py
+
+import asyncio
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """
+    One streaming connection waiting for messages on its event loop.
+    """
+
+    def __init__(self, maxsize=100):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def put(self, message):
+        # Runs on the subscriber's loop. A client that stopped reading
+        # loses messages rather than growing the queue without bound.
+        if not self.queue.full():
+            self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """
+    Publishes messages to the streaming connections served by this process.
+
+    publish() and has_subscribers() may be called from any thread, e.g. the
+    notification dispatcher's worker. Deployments running several ASGI processes should
+    point NOTIFICATIONS_PUBSUB_BACKEND at a broker with the same interface
+    backed by a shared channel.
+    """
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription()
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[user_id]
+
+    def has_subscribers(self, user_id):
+        with self._lock:
+            return bool(self._subscriptions.get(user_id))
+
+    def publish(self, user_id, message):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, message)
+            except RuntimeError:
+                # The subscriber's event loop has already shut down.
+                self.unsubscribe(user_id, subscription)
+
+
+@lru_cache(maxsize=None)
+def load_broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return load_broker(getattr(settings, 'NOTIFICATIONS_PUBSUB_BACKEND', 'notifications.pubsub.InProcessBroker'))
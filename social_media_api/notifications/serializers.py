@@ -2,13 +2,17 @@
 
 from rest_framework import serializers
 from .models import Notification
+from social_media_api.eager_loading import EagerLoadingMixin
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     actor = serializers.ReadOnlyField(source='actor.username')
     target_object_id = serializers.ReadOnlyField(source='object_id')
     target_content_type = serializers.ReadOnlyField(source='content_type.model')
 
     class Meta:
         model = Notification
-        fields = ['id', 'recipient', 'actor', 'verb', 'target_content_type', 'target_object_id', 'timestamp', 'is_read']
-        read_only_fields = ['timestamp', 'is_read', 'recipient']
\ No newline at end of file
+        fields = ['id', 'recipient', 'actor', 'actor_count', 'sample_actors', 'verb', 'target_content_type', 'target_object_id', 'timestamp', 'is_read']
+        read_only_fields = ['timestamp', 'is_read', 'recipient', 'actor_count', 'sample_actors']
+
+class MarkReadSerializer(serializers.Serializer):
+    up_to = serializers.IntegerField(required=False, min_value=1, help_text='Only mark notifications with an id up to and including this one.')
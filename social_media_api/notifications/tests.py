@@ -1,3 +1,319 @@
-from django.test import TestCase
+# notifications/tests.py
 
-# Create your tests here.
+import asyncio
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from .dispatch import NotificationDispatcher, send, write_notifications
+from .pubsub import InProcessBroker, get_broker
+from .models import Notification, ArchivedNotification
+from .unread import unread_cache_key
+
+User = get_user_model()
+
+
+class NotificationDispatchTests(TestCase):
+    """
+    Tests for the batched notification dispatcher.
+    """
+
+    def setUp(self):
+        self.recipient = User.objects.create_user(username='recipient', password='testpassword')
+        self.actor = User.objects.create_user(username='actor', password='testpassword')
+
+    def build(self):
+        return Notification(recipient=self.recipient, actor=self.actor, verb='followed you', target=self.actor)
+
+    @override_settings(NOTIFICATIONS_ASYNC=True)
+    def test_async_send_waits_for_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            send([self.build()])
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(Notification.objects.exists())
+
+    @override_settings(NOTIFICATIONS_ASYNC=False, NOTIFICATIONS_COALESCE_WINDOW=0)
+    def test_sync_send_writes_immediately(self):
+        send([self.build(), self.build()])
+        self.assertEqual(Notification.objects.count(), 2)
+
+    @override_settings(NOTIFICATIONS_COALESCE_WINDOW=0)
+    def test_flush_writes_queue_in_batches(self):
+        dispatcher = NotificationDispatcher(batch_size=2)
+        for _ in range(5):
+            dispatcher.queue.put(self.build())
+
+        # One INSERT per batch, each in its own savepoint.
+        with self.assertNumQueries(9):
+            dispatcher.flush()
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertTrue(dispatcher.queue.empty())
+
+
+@override_settings(NOTIFICATIONS_COALESCE_WINDOW=0)
+class NotificationWorkerTests(TransactionTestCase):
+    """
+    Tests for the dispatcher writing in autocommit, as its worker thread does.
+    """
+
+    def setUp(self):
+        self.recipient = User.objects.create_user(username='recipient', password='testpassword')
+        self.actor = User.objects.create_user(username='actor', password='testpassword')
+
+    def test_count_is_invalidated_after_the_rows_are_committed(self):
+        seen = []
+
+        def invalidate(recipient_ids):
+            seen.append((connection.in_atomic_block, Notification.objects.count()))
+
+        dispatcher = NotificationDispatcher()
+        dispatcher.queue.put(Notification(recipient=self.recipient, actor=self.actor, verb='followed you', target=self.actor))
+        with mock.patch('notifications.dispatch.invalidate_unread_count', invalidate):
+            dispatcher.flush()
+        self.assertEqual(seen, [(False, 1)])
+
+    @override_settings(NOTIFICATIONS_COALESCE_WINDOW=3600)
+    def test_failed_batch_writes_nothing(self):
+        write_notifications([Notification(recipient=self.recipient, actor=self.actor, verb='liked your post', target=self.actor)])
+        other = User.objects.create_user(username='other', password='testpassword')
+
+        dispatcher = NotificationDispatcher()
+        # One event merges into the existing row, the other needs a new one.
+        dispatcher.queue.put(Notification(recipient=self.recipient, actor=other, verb='liked your post', target=self.actor))
+        dispatcher.queue.put(Notification(recipient=self.recipient, actor=other, verb='liked your post', target=other))
+        with mock.patch.object(Notification.objects, 'bulk_create', side_effect=RuntimeError), \
+                self.assertLogs('notifications.dispatch', 'ERROR'):
+            dispatcher.flush()
+        notification = Notification.objects.get()
+        self.assertEqual((notification.actor_count, notification.actor), (1, self.actor))
+
+
+@override_settings(NOTIFICATIONS_COALESCE_WINDOW=3600)
+class NotificationCoalescingTests(TestCase):
+    """
+    Tests for merging repeated events on the same target into one row.
+    """
+
+    def setUp(self):
+        self.recipient = User.objects.create_user(username='recipient', password='testpassword')
+        self.actors = [User.objects.create_user(username=f'actor{i}', password='testpassword') for i in range(5)]
+
+    def build(self, actor, target=None):
+        return Notification(recipient=self.recipient, actor=actor, verb='liked your post', target=target or self.recipient)
+
+    def test_events_on_same_target_are_merged(self):
+        write_notifications([self.build(actor) for actor in self.actors[:2]])
+        Notification.objects.update(is_read=True)
+        write_notifications([self.build(actor) for actor in self.actors[2:]])
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.actor_count, 5)
+        self.assertEqual(notification.actor, self.actors[4])
+        self.assertEqual(notification.sample_actors, ['actor4', 'actor3', 'actor2'])
+        self.assertFalse(notification.is_read)
+
+    @override_settings(NOTIFICATIONS_PUBSUB_BACKEND='notifications.tests.LocalBroker')
+    def test_merging_and_publishing_run_fixed_queries(self):
+        targets = [User.objects.create_user(username=f'target{i}', password='testpassword') for i in range(10)]
+        write_notifications([self.build(self.actors[0], target) for target in targets])
+        get_broker().published.clear()
+
+        # One lookup and one bulk_update inside a savepoint; serializing the
+        # merged rows for publishing reads nothing more.
+        with self.assertNumQueries(4), self.captureOnCommitCallbacks(execute=True):
+            write_notifications([self.build(self.actors[1], target) for target in targets])
+        self.assertEqual(len(get_broker().published), 10)
+        self.assertTrue(all(message['actor'] == 'actor1' for _, message in get_broker().published))
+
+    def test_rows_being_merged_into_are_locked(self):
+        write_notifications([self.build(self.actors[0])])
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True, side_effect=QuerySet.select_for_update) as lock:
+            write_notifications([self.build(self.actors[1])])
+        # Only the notification rows, not the actors and content types joined in.
+        self.assertEqual(lock.call_args.kwargs, {'of': ('self',)})
+        self.assertEqual(Notification.objects.get().actor_count, 2)
+
+    def test_nothing_is_serialized_without_subscribers(self):
+        with mock.patch('notifications.dispatch.NotificationSerializer') as serializer:
+            with self.captureOnCommitCallbacks(execute=True):
+                write_notifications([self.build(self.actors[0])])
+        serializer.assert_not_called()
+
+    def test_events_on_different_targets_are_kept_apart(self):
+        write_notifications([self.build(self.actors[0]), self.build(self.actors[1], target=self.actors[1])])
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_events_outside_window_are_not_merged(self):
+        write_notifications([self.build(self.actors[0])])
+        Notification.objects.update(timestamp=timezone.now() - timedelta(hours=2))
+        write_notifications([self.build(self.actors[1])])
+        self.assertEqual(Notification.objects.count(), 2)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, NOTIFICATIONS_COALESCE_WINDOW=0)
+class UnreadNotificationTests(APITestCase):
+    """
+    Tests for the unread counter and the bulk mark-read endpoint.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.recipient = User.objects.create_user(username='recipient', password='testpassword')
+        self.actor = User.objects.create_user(username='actor', password='testpassword')
+        write_notifications([
+            Notification(recipient=self.recipient, actor=self.actor, verb='followed you', target=self.actor)
+            for _ in range(3)
+        ])
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.recipient).key)
+
+    def test_unread_count_is_cached(self):
+        response = self.client.get(reverse('notification-unread-count'))
+        self.assertEqual(response.data['unread_count'], 3)
+
+        # With the token and the count both cached, no query runs at all.
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('notification-unread-count'))
+        self.assertEqual(response.data['unread_count'], 3)
+
+    def test_count_is_invalidated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            write_notifications([Notification(recipient=self.recipient, actor=self.actor, verb='followed you', target=self.actor)])
+            # A poll from another connection before the commit still sees,
+            # and caches, the old count.
+            cache.set(unread_cache_key(self.recipient.pk), 3)
+
+        response = self.client.get(reverse('notification-unread-count'))
+        self.assertEqual(response.data['unread_count'], 4)
+
+    def test_mark_read_up_to_id(self):
+        first = Notification.objects.order_by('id').first()
+        self.client.get(reverse('notification-unread-count'))
+
+        response = self.client.post(reverse('notification-mark-read'), {'up_to': first.pk}, format='json')
+        self.assertEqual(response.data['marked_read'], 1)
+        response = self.client.get(reverse('notification-unread-count'))
+        self.assertEqual(response.data['unread_count'], 2)
+
+    def test_mark_all_read(self):
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('notification-mark-read'), format='json')
+        self.assertEqual(response.data['marked_read'], 3)
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+
+    def test_detail_is_limited_to_recipient(self):
+        other = Notification.objects.create(recipient=self.actor, actor=self.recipient, verb='followed you', target=self.recipient)
+        response = self.client.get(reverse('notification-detail', kwargs={'pk': other.pk}))
+        self.assertEqual(response.status_code, 404)
+
+
+class LocalBroker(InProcessBroker):
+    """
+    Stand-in broker that also records what was published.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def has_subscribers(self, user_id):
+        return True
+
+    def publish(self, user_id, message):
+        self.published.append((user_id, message))
+        super().publish(user_id, message)
+
+
+@override_settings(
+    SECURE_SSL_REDIRECT=False,
+    NOTIFICATIONS_COALESCE_WINDOW=0,
+    NOTIFICATIONS_PUBSUB_BACKEND='notifications.tests.LocalBroker',
+)
+class NotificationStreamTests(TestCase):
+    """
+    Tests for pushing new notifications to streaming clients.
+    """
+
+    def setUp(self):
+        self.recipient = User.objects.create_user(username='recipient', password='testpassword')
+        self.actor = User.objects.create_user(username='actor', password='testpassword')
+        self.token = Token.objects.create(user=self.recipient)
+
+    def test_written_notifications_are_published(self):
+        broker = get_broker()
+        broker.published.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            write_notifications([
+                Notification(recipient=self.recipient, actor=self.actor, verb='followed you', target=self.actor)
+            ])
+        self.assertEqual(len(broker.published), 1)
+        user_id, message = broker.published[0]
+        self.assertEqual(user_id, self.recipient.pk)
+        self.assertEqual(message['actor'], 'actor')
+
+    async def test_broker_delivers_across_threads(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe(self.recipient.pk)
+        thread = threading.Thread(target=broker.publish, args=(self.recipient.pk, {'id': 1}))
+        thread.start()
+        message = await asyncio.wait_for(subscription.get(), timeout=1)
+        thread.join()
+        self.assertEqual(message, {'id': 1})
+
+    async def test_stream_requires_token(self):
+        response = await self.async_client.get(reverse('notification-stream'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_pushes_published_notification(self):
+        response = await self.async_client.get(
+            reverse('notification-stream'), headers={'Authorization': 'Token ' + self.token.key}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b': connected\n\n')
+
+        get_broker().publish(self.recipient.pk, {'id': 7, 'verb': 'followed you'})
+        event = await asyncio.wait_for(anext(stream), timeout=1)
+        self.assertEqual(event, b'id: 7\nevent: notification\ndata: {"id": 7, "verb": "followed you"}\n\n')
+        await stream.aclose()
+
+
+class ArchiveNotificationsTests(TestCase):
+    """
+    Tests for the notification retention command.
+    """
+
+    def setUp(self):
+        self.recipient = User.objects.create_user(username='recipient', password='testpassword')
+        self.actor = User.objects.create_user(username='actor', password='testpassword')
+        Notification.objects.bulk_create([
+            Notification(recipient=self.recipient, actor=self.actor, verb='followed you', target=self.actor, is_read=is_read)
+            for is_read in (True, True, True, False)
+        ])
+        Notification.objects.update(timestamp=timezone.now() - timedelta(days=60))
+        self.recent = Notification.objects.create(
+            recipient=self.recipient, actor=self.actor, verb='followed you', target=self.actor, is_read=True
+        )
+
+    def test_archives_old_read_notifications_in_batches(self):
+        call_command('archive_notifications', days=30, batch_size=2, stdout=StringIO())
+
+        self.assertEqual(ArchivedNotification.objects.count(), 3)
+        self.assertEqual(Notification.objects.filter(is_read=True).get(), self.recent)
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 1)
+
+    def test_dry_run_changes_nothing(self):
+        out = StringIO()
+        call_command('archive_notifications', days=30, dry_run=True, stdout=out)
+        self.assertIn('3 notifications would be archived', out.getvalue())
+        self.assertFalse(ArchivedNotification.objects.exists())
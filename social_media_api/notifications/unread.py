@@ -0,0 +1,44 @@
+# notifications/unread.py
+
+from django.conf import settings
+from django.core.cache import cache
+from .models import Notification
+
+
+def unread_cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user):
+    """
+    Return the number of unread notifications of a user.
+
+    The count is cached for NOTIFICATIONS_UNREAD_CACHE_TIMEOUT seconds and
+    dropped whenever notifications are written or marked read, so badge
+    polling rarely reaches the database.
+    """
+    key = unread_cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(recipient=user, is_read=False).count()
+        cache.set(key, count, getattr(settings, 'NOTIFICATIONS_UNREAD_CACHE_TIMEOUT', 60))
+    return count
+
+
+def invalidate_unread_count(user_ids):
+    cache.delete_many([unread_cache_key(user_id) for user_id in set(user_ids)])
+
+
+def mark_read(user, up_to=None):
+    """
+    Mark the user's unread notifications as read in a single UPDATE,
+    optionally only those with an id up to and including `up_to`.
+    Returns the number of notifications changed.
+    """
+    unread = Notification.objects.filter(recipient=user, is_read=False)
+    if up_to is not None:
+        unread = unread.filter(pk__lte=up_to)
+    updated = unread.update(is_read=True)
+    if updated:
+        invalidate_unread_count([user.pk])
+    return updated
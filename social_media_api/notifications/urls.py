@@ -1,9 +1,12 @@
 # notifications/urls.py
 
 from django.urls import path
-from .views import NotificationListView, NotificationDetailView
+from .views import NotificationListView, NotificationDetailView, UnreadCountView, MarkReadView, notification_stream
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notification-list'),
     path('<int:pk>/', NotificationDetailView.as_view(), name='notification-detail'),
+    path('unread-count/', UnreadCountView.as_view(), name='notification-unread-count'),
+    path('mark-read/', MarkReadView.as_view(), name='notification-mark-read'),
+    path('stream/', notification_stream, name='notification-stream'),
 ]
\ No newline at end of file
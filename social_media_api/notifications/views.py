@@ -1,31 +1,130 @@
 # notifications/views.py
 
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max, Q
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework import generics
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.authtoken.models import Token
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import NotificationSerializer, MarkReadSerializer
+from .pubsub import get_broker
+from .unread import get_unread_count, invalidate_unread_count, mark_read
+from social_media_api.authentication import CachedTokenAuthentication
+from social_media_api.conditional import ConditionalGetMixin
+from social_media_api.pagination import NotificationKeysetPagination
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(ConditionalGetMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationKeysetPagination
 
     def get_queryset(self):
         # Return all notifications for the authenticated user, ordered by timestamp
-        return Notification.objects.filter(recipient=self.request.user).order_by('-timestamp')
+        queryset = Notification.objects.filter(recipient=self.request.user).order_by('-timestamp')
+        return NotificationSerializer.setup_eager_loading(queryset)
+
+    def get_list_validators(self):
+        # Coalescing moves the timestamp forward, reading changes the unread
+        # count and archiving changes the total, so together they cover
+        # every change to the list in one indexed aggregate.
+        counts = Notification.objects.filter(recipient=self.request.user).aggregate(
+            last=Max('timestamp'), total=Count('pk'), unread=Count('pk', filter=Q(is_read=False)),
+        )
+        return tuple(counts.values()), None
 
 class NotificationDetailView(generics.RetrieveUpdateAPIView):
     serializer_class = NotificationSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
-    queryset = Notification.objects.all()
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(recipient=self.request.user)
+        return NotificationSerializer.setup_eager_loading(queryset)
 
     def update(self, request, *args, **kwargs):
         # Allow marking a notification as read
         instance = self.get_object()
         if request.data.get('is_read'):
-            instance.is_read = True
-            instance.save()
+            if not instance.is_read:
+                instance.is_read = True
+                instance.save(update_fields=['is_read'])
+                invalidate_unread_count([instance.recipient_id])
             return Response(self.get_serializer(instance).data)
-        return super().update(request, *args, **kwargs)
\ No newline at end of file
+        return super().update(request, *args, **kwargs)
+
+class UnreadCountView(generics.GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({'unread_count': get_unread_count(request.user)})
+
+class MarkReadView(generics.GenericAPIView):
+    """
+    Mark all unread notifications as read, or only those up to a given id,
+    with a single UPDATE.
+    """
+    serializer_class = MarkReadSerializer
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = mark_read(request.user, up_to=serializer.validated_data.get('up_to'))
+        return Response({'marked_read': updated})
+
+async def get_token_user(request):
+    # Async counterpart of TokenAuthentication for the streaming view.
+    keyword, _, key = request.headers.get('Authorization', '').partition(' ')
+    if keyword != 'Token' or not key:
+        return None
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        return None
+    return token.user if token.user.is_active else None
+
+async def event_stream(broker, user_id, heartbeat):
+    subscription = broker.subscribe(user_id)
+    try:
+        yield ': connected\n\n'
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                # Comment lines keep proxies from closing an idle connection.
+                yield ': keep-alive\n\n'
+                continue
+            data = json.dumps(message, cls=DjangoJSONEncoder)
+            yield f'id: {message["id"]}\nevent: notification\ndata: {data}\n\n'
+    finally:
+        broker.unsubscribe(user_id, subscription)
+
+async def notification_stream(request):
+    """
+    Server-sent events stream of the authenticated user's new notifications.
+
+    Each notification is pushed as it is written instead of clients polling
+    the list endpoint. Serve the project over ASGI (asgi.py) so every open
+    stream costs a coroutine rather than a worker.
+    """
+    user = await get_token_user(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    heartbeat = getattr(settings, 'NOTIFICATIONS_STREAM_HEARTBEAT', 15)
+    response = StreamingHttpResponse(
+        event_stream(get_broker(), user.pk, heartbeat),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,117 @@
+# posts/feed.py
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from .models import Post, FeedEntry
+
+FANOUT_BATCH_SIZE = 1000
+
+
+def get_fanout_limit():
+    # Authors with more followers than this are read-merged instead of fanned out.
+    return getattr(settings, 'FEED_FANOUT_LIMIT', 10000)
+
+
+def get_backfill_size():
+    # How many recent posts are copied into a feed when a user follows someone.
+    return getattr(settings, 'FEED_BACKFILL_SIZE', 20)
+
+
+def fan_out_post(post):
+    """
+    Copy a newly created post into the feed of every follower of its author.
+
+    If the author has more followers than the fan-out limit, the author is
+    flagged with fanout_on_read and nothing is written; feed_for() merges
+    those posts in at read time. Returns the number of entries written.
+    """
+    author = post.author
+    if author.fanout_on_read:
+        return 0
+
+    # The counter saves reading the follower list of large accounts; the
+    # list is still capped in case the counter has drifted.
+    limit = get_fanout_limit()
+    follower_ids = []
+    if author.follower_count <= limit:
+        follower_ids = list(author.followers.values_list('pk', flat=True)[:limit + 1])
+    if author.follower_count > limit or len(follower_ids) > limit:
+        get_user_model().objects.filter(pk=author.pk).update(fanout_on_read=True)
+        author.fanout_on_read = True
+        return 0
+
+    entries = [
+        FeedEntry(owner_id=follower_id, post=post, author_id=post.author_id, created_at=post.created_at)
+        for follower_id in follower_ids
+    ]
+    FeedEntry.objects.bulk_create(entries, batch_size=FANOUT_BATCH_SIZE, ignore_conflicts=True)
+    return len(entries)
+
+
+def backfill_feed(user, author):
+    """
+    Copy the author's most recent posts into the user's feed after a follow.
+    """
+    if author.fanout_on_read:
+        return 0
+
+    recent = Post.objects.filter(author=author).order_by('-created_at')[:get_backfill_size()]
+    entries = [
+        FeedEntry(owner=user, post_id=pk, author=author, created_at=created_at)
+        for pk, created_at in recent.values_list('pk', 'created_at')
+    ]
+    FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+    return len(entries)
+
+
+def backfill_feeds(user, author_ids):
+    """
+    Copy the most recent posts of several authors into the user's feed in
+    one read and one write, e.g. after a bulk follow.
+    """
+    recent = (
+        Post.objects.filter(author_id__in=author_ids, author__fanout_on_read=False)
+        .annotate(rank=Window(RowNumber(), partition_by=F('author_id'), order_by=F('created_at').desc()))
+        .filter(rank__lte=get_backfill_size())
+    )
+    entries = [
+        FeedEntry(owner=user, post_id=pk, author_id=author_id, created_at=created_at)
+        for pk, author_id, created_at in recent.values_list('pk', 'author_id', 'created_at')
+    ]
+    FeedEntry.objects.bulk_create(entries, batch_size=FANOUT_BATCH_SIZE, ignore_conflicts=True)
+    return len(entries)
+
+
+def remove_from_feed(user, author):
+    """
+    Drop every post by the author from the user's feed after an unfollow.
+    """
+    return FeedEntry.objects.filter(owner=user, author=author).delete()[0]
+
+
+def feed_for(user):
+    """
+    Return the home feed of a user, newest first.
+
+    Posts by regular authors come from the user's materialized FeedEntry rows.
+    Posts by followed fanout_on_read authors are pulled from the Post table.
+
+    Every post is annotated with its feed position, (feed_created_at,
+    feed_post_id), which FeedKeysetPagination orders and filters on. For a
+    materialized feed these are the FeedEntry columns, so a page is a range
+    scan of posts_feed_owner_created_idx that stops after one page, with a
+    primary key lookup per post.
+    """
+    pull_author_ids = list(user.following.filter(fanout_on_read=True).values_list('pk', flat=True))
+    if not pull_author_ids:
+        return Post.objects.filter(feed_entries__owner=user).annotate(
+            feed_created_at=F('feed_entries__created_at'),
+            feed_post_id=F('feed_entries__post_id'),
+        )
+
+    in_feed = FeedEntry.objects.filter(owner=user).values('post_id')
+    return Post.objects.filter(
+        Q(pk__in=in_feed) | Q(author_id__in=pull_author_ids)
+    ).annotate(feed_created_at=F('created_at'), feed_post_id=F('id'))
@@ -0,0 +1,22 @@
+# posts/management/commands/rebuild_feeds.py
+
+from django.core.management.base import BaseCommand
+from posts.feed import fan_out_post
+from posts.models import Post, FeedEntry
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized home feeds from existing posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Delete all feed entries before rebuilding.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            deleted, _ = FeedEntry.objects.all().delete()
+            self.stdout.write(f'Deleted {deleted} feed entries.')
+
+        written = 0
+        for post in Post.objects.select_related('author').order_by('pk').iterator():
+            written += fan_out_post(post)
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} feed entries.'))
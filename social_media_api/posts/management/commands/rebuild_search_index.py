@@ -0,0 +1,12 @@
+# posts/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+from posts.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the post search index, e.g. after posts were written with bulk_create().'
+
+    def handle(self, *args, **options):
+        indexed = get_search_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} posts.'))
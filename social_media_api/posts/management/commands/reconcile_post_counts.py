@@ -0,0 +1,30 @@
+# posts/management/commands/reconcile_post_counts.py
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from posts.models import Post, Like, Comment
+from posts.versions import bump_posts_version
+
+
+def count_subquery(model):
+    counts = (
+        model.objects.filter(post=OuterRef('pk'))
+        .order_by()
+        .values('post')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+class Command(BaseCommand):
+    help = 'Recompute Post.like_count and Post.comment_count from the Like and Comment tables.'
+
+    def handle(self, *args, **options):
+        updated = Post.objects.update(
+            like_count=count_subquery(Like),
+            comment_count=count_subquery(Comment),
+        )
+        bump_posts_version()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled counters on {updated} posts.'))
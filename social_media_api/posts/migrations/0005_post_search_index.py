@@ -0,0 +1,47 @@
+# Search index for posts; see posts/search.py.
+
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE posts_post ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX posts_post_search_vector_idx ON posts_post USING GIN (search_vector)',
+]
+POSTGRES_BACKWARD = [
+    'DROP INDEX posts_post_search_vector_idx',
+    'ALTER TABLE posts_post DROP COLUMN search_vector',
+]
+SQLITE_FORWARD = [
+    'CREATE VIRTUAL TABLE posts_post_fts USING fts5(title, content)',
+    'INSERT INTO posts_post_fts (rowid, title, content) SELECT id, title, content FROM posts_post',
+]
+SQLITE_BACKWARD = [
+    'DROP TABLE posts_post_fts',
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {'postgresql': postgres, 'sqlite': sqlite}.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_post_comment_count_post_like_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
@@ -9,6 +9,16 @@ class Post(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized counters, kept in step with F() increments by the like and
+    # comment views. Run 'manage.py reconcile_post_counts' to repair drift.
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination of post lists on (created_at, id).
+            models.Index(fields=['-created_at', '-id'], name='posts_post_created_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -20,6 +30,12 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Backs the paginated comment list of a post, oldest first.
+            models.Index(fields=['post', 'created_at', 'id'], name='posts_comment_post_created_idx'),
+        ]
+
     def __str__(self):
         return f'Comment by {self.author.username} on {self.post.title}'
 
@@ -32,4 +48,22 @@ class Like(models.Model):
         unique_together = ('user', 'post') # Prevents a user from liking the same post more than once
 
     def __str__(self):
-        return f'{self.user.username} likes {self.post.title}'
\ No newline at end of file
+        return f'{self.user.username} likes {self.post.title}'
+
+class FeedEntry(models.Model):
+    # One row per (follower, post), written when the post is created.
+    # created_at is copied from the post so a feed page is a single range
+    # scan over (owner, created_at) without touching the follow graph.
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='feed_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='feed_entries')
+    author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('owner', 'post')
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-post'], name='posts_feed_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} in feed of {self.owner_id}'
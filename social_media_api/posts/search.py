@@ -0,0 +1,143 @@
+# posts/search.py
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+SEARCH_PARAM = 'search'
+FTS_TABLE = 'posts_post_fts'
+SEARCH_CONFIG = 'english'
+
+
+def get_search_terms(request):
+    return request.query_params.get(SEARCH_PARAM, '').strip()
+
+
+class PostgresPostSearch:
+    """
+    Searches the stored, GIN-indexed tsvector column posts_post.search_vector.
+
+    The column is generated by PostgreSQL from title (weight A) and content
+    (weight B), so it never needs to be written from Python.
+    """
+
+    def search(self, queryset, terms):
+        query = f"websearch_to_tsquery('{SEARCH_CONFIG}', %s)"
+        return queryset.filter(
+            RawSQL(f'"posts_post"."search_vector" @@ {query}', (terms,), output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(f'ts_rank("posts_post"."search_vector", {query})', (terms,), output_field=FloatField())
+        )
+
+    def index_posts(self, posts):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+class SQLitePostSearch:
+    """
+    Searches the FTS5 table posts_post_fts, whose rowid is the post id.
+
+    The table holds its own copy of title and content. posts/signals.py keeps
+    it in step with saves and deletes; 'manage.py rebuild_search_index'
+    repairs it after bulk writes, which send no signals.
+    """
+
+    def match_expression(self, terms):
+        # Quote every word so user input can never be read as FTS5 syntax.
+        return ' '.join(f'"{word}"' for word in re.findall(r'\w+', terms))
+
+    def search(self, queryset, terms):
+        match = self.match_expression(terms)
+        if not match:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', (match,))
+        ).annotate(
+            # bm25() is lower for better matches.
+            search_rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, 2.0, 1.0) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s AND rowid = "posts_post"."id"',
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+
+    def index_posts(self, posts):
+        rows = [(post.pk, post.title, post.content) for post in posts]
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(f'INSERT INTO {FTS_TABLE} (rowid, title, content) VALUES (%s, %s, %s)', rows)
+
+    def remove_posts(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in post_ids])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(f'INSERT INTO {FTS_TABLE} (rowid, title, content) SELECT id, title, content FROM posts_post')
+            return cursor.rowcount
+
+
+class FallbackPostSearch:
+    """
+    Unindexed substring search for databases without a backend above.
+    """
+
+    def search(self, queryset, terms):
+        words = terms.split()
+        condition = Q()
+        for word in words:
+            condition &= Q(title__icontains=word) | Q(content__icontains=word)
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index_posts(self, posts):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def rebuild(self):
+        return 0
+
+
+SEARCH_BACKENDS = {
+    'postgresql': PostgresPostSearch(),
+    'sqlite': SQLitePostSearch(),
+}
+
+
+def get_search_backend():
+    return SEARCH_BACKENDS.get(connection.vendor, FallbackPostSearch())
+
+
+class PostSearchFilter(BaseFilterBackend):
+    """
+    Full-text search over post title and content through ?search=, ranked
+    best match first. Replaces SearchFilter, whose icontains lookups scan
+    the whole table.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = get_search_terms(request)
+        if not terms:
+            return queryset
+        return get_search_backend().search(queryset, terms)
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': SEARCH_PARAM,
+            'required': False,
+            'in': 'query',
+            'description': 'Words to search post titles and content for.',
+            'schema': {'type': 'string'},
+        }]
@@ -2,20 +2,24 @@
 
 from rest_framework import serializers
 from .models import Post, Comment
+from social_media_api.eager_loading import EagerLoadingMixin
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
     
     class Meta:
         model = Post
-        fields = ['id', 'author', 'title', 'content', 'created_at', 'updated_at']
-        read_only_fields = ['author', 'created_at', 'updated_at']
+        fields = ['id', 'author', 'title', 'content', 'created_at', 'updated_at', 'like_count', 'comment_count']
+        read_only_fields = ['author', 'created_at', 'updated_at', 'like_count', 'comment_count']
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
-    post = serializers.ReadOnlyField(source='post.id')
+    post = serializers.ReadOnlyField(source='post_id')
 
     class Meta:
         model = Comment
         fields = ['id', 'author', 'post', 'content', 'created_at', 'updated_at']
-        read_only_fields = ['author', 'post', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['author', 'post', 'created_at', 'updated_at']
+
+class BulkLikeSerializer(serializers.Serializer):
+    post_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
@@ -0,0 +1,23 @@
+# posts/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Post
+from .search import get_search_backend
+from .versions import bump_posts_version
+
+SEARCHED_FIELDS = {'title', 'content'}
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, update_fields=None, **kwargs):
+    bump_posts_version()
+    if update_fields is not None and not SEARCHED_FIELDS & set(update_fields):
+        return
+    get_search_backend().index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    bump_posts_version()
+    get_search_backend().remove_posts([instance.pk])
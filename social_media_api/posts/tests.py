@@ -1,3 +1,383 @@
-from django.test import TestCase
+# posts/tests.py
 
-# Create your tests here.
+import warnings
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.paginator import UnorderedObjectListWarning
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase, APIClient
+from social_media_api.pagination import FeedKeysetPagination
+from . import views
+from .feed import feed_for
+from .models import Comment, Post, FeedEntry, Like
+from .serializers import PostSerializer
+
+User = get_user_model()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class FeedTests(APITestCase):
+    """
+    Tests for the materialized home feed.
+    """
+
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader', password='testpassword')
+        self.author = User.objects.create_user(username='author', password='testpassword')
+        self.stranger = User.objects.create_user(username='stranger', password='testpassword')
+        self.author.followers.add(self.reader)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.reader).key)
+        self.author_client = APIClient()
+        self.author_client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.author).key)
+        self.feed_url = reverse('user-feed')
+
+    def create_post(self, title):
+        return self.author_client.post(reverse('post-list'), {'title': title, 'content': 'Body'}, format='json')
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        response = self.create_post('Hello')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(FeedEntry.objects.filter(owner=self.reader, post_id=response.data['id']).exists())
+
+        response = self.client.get(self.feed_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([post['title'] for post in response.data['results']], ['Hello'])
+
+    def test_posts_by_unfollowed_authors_are_not_in_feed(self):
+        Post.objects.create(author=self.stranger, title='Elsewhere', content='Body')
+        response = self.client.get(self.feed_url)
+        self.assertEqual(response.data['results'], [])
+
+    def test_follow_backfills_and_unfollow_clears_feed(self):
+        Post.objects.create(author=self.stranger, title='Earlier', content='Body')
+        follow_url = reverse('follow-unfollow', kwargs={'user_id': self.stranger.pk})
+
+        self.client.post(follow_url)
+        response = self.client.get(self.feed_url)
+        self.assertEqual([post['title'] for post in response.data['results']], ['Earlier'])
+
+        self.client.post(follow_url)
+        response = self.client.get(self.feed_url)
+        self.assertEqual(response.data['results'], [])
+
+    def test_feed_pages_follow_feed_entry_order(self):
+        posts = Post.objects.bulk_create([
+            Post(author=self.author, title=f'Post {i}', content='Body') for i in range(5)
+        ])
+        FeedEntry.objects.bulk_create([
+            FeedEntry(owner=self.reader, post=post, author=self.author, created_at=post.created_at) for post in posts
+        ])
+        response = self.client.get(self.feed_url, {'page_size': 3})
+        ids = [post['id'] for post in response.data['results']]
+        response = self.client.get(response.data['next'])
+        ids += [post['id'] for post in response.data['results']]
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(ids, list(
+            FeedEntry.objects.filter(owner=self.reader).order_by('-created_at', '-post_id').values_list('post_id', flat=True)
+        ))
+
+    def test_feed_page_is_a_range_scan_of_the_feed_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Checks an SQLite query plan.')
+        post = Post.objects.create(author=self.author, title='Hello', content='Body')
+        FeedEntry.objects.create(owner=self.reader, post=post, author=self.author, created_at=post.created_at)
+
+        pagination = FeedKeysetPagination()
+        feed = PostSerializer.setup_eager_loading(feed_for(self.reader)).order_by(*pagination.ordering)
+        for page in (feed, feed.filter(pagination.get_position_filter(post.created_at, post.pk))):
+            plan = page[:11].explain()
+            # Entries are read in index order and the page is never sorted.
+            self.assertIn('posts_feed_owner_created_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    @override_settings(FEED_FANOUT_LIMIT=0)
+    def test_high_fanout_author_is_merged_on_read(self):
+        response = self.create_post('Popular')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(FeedEntry.objects.exists())
+        self.author.refresh_from_db()
+        self.assertTrue(self.author.fanout_on_read)
+
+        response = self.client.get(self.feed_url)
+        self.assertEqual([post['title'] for post in response.data['results']], ['Popular'])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PostPaginationTests(APITestCase):
+    """
+    Tests for keyset pagination of post lists.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='testpassword')
+        Post.objects.bulk_create([
+            Post(author=self.author, title=f'Post {i}', content='Body') for i in range(15)
+        ])
+        self.list_url = reverse('post-list')
+
+    def test_pages_cover_every_post_once(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 10)
+        ids = [post['id'] for post in response.data['results']]
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+        ids += [post['id'] for post in response.data['results']]
+
+        self.assertEqual(ids, list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.list_url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PostCounterTests(APITestCase):
+    """
+    Tests for the denormalized like and comment counters on Post.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='testpassword')
+        self.author = User.objects.create_user(username='author', password='testpassword')
+        self.post = Post.objects.create(author=self.author, title='Counted', content='Body')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+
+    def test_like_updates_like_count(self):
+        self.client.post(reverse('post-like', kwargs={'pk': self.post.pk}))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.post.pk}))
+        self.assertEqual(response.data['like_count'], 1)
+
+    def test_comment_create_and_delete_update_comment_count(self):
+        response = self.client.post(
+            reverse('post-comments-list', kwargs={'post_pk': self.post.pk}),
+            {'content': 'Nice'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 1)
+
+        self.client.delete(reverse('post-comments-detail', kwargs={'post_pk': self.post.pk, 'pk': response.data['id']}))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comment_count, 0)
+
+    def test_reconcile_post_counts(self):
+        Like.objects.create(user=self.user, post=self.post)
+        Post.objects.filter(pk=self.post.pk).update(comment_count=7)
+
+        call_command('reconcile_post_counts', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count), (1, 0))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, NOTIFICATIONS_ASYNC=False)
+class LikeTests(APITestCase):
+    """
+    Tests for the idempotent like and unlike endpoints.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='testpassword')
+        self.author = User.objects.create_user(username='author', password='testpassword')
+        self.post = Post.objects.create(author=self.author, title='Liked', content='Body')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+        self.like_url = reverse('post-like', kwargs={'pk': self.post.pk})
+        self.unlike_url = reverse('post-unlike', kwargs={'pk': self.post.pk})
+
+    def test_repeated_like_is_a_no_op(self):
+        self.assertEqual(self.client.post(self.like_url).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.client.post(self.like_url).status_code, status.HTTP_200_OK)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(self.author.notifications.count(), 1)
+
+    def test_like_writes_one_insert_and_one_update(self):
+        def like_writes():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(self.like_url)
+            return [
+                query['sql'].split()[0] for query in queries
+                if '"posts_like"' in query['sql'] or query['sql'].startswith(('UPDATE "posts_post"', 'ROLLBACK'))
+            ]
+
+        self.assertEqual(like_writes(), ['INSERT', 'UPDATE'])
+        # A repeated like is skipped by the insert itself, not by rolling back
+        # a failed one, and the counter is untouched.
+        self.assertEqual(like_writes(), ['INSERT'])
+
+    def test_repeated_unlike_is_a_no_op(self):
+        self.client.post(self.like_url)
+        self.assertEqual(self.client.post(self.unlike_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.post(self.unlike_url).status_code, status.HTTP_200_OK)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 0)
+        self.assertFalse(Like.objects.exists())
+
+    def test_like_missing_post(self):
+        self.assertEqual(self.client.post(reverse('post-like', kwargs={'pk': 9999})).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.post(reverse('post-unlike', kwargs={'pk': 9999})).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_decrements_do_not_take_drifted_counters_below_zero(self):
+        Like.objects.create(user=self.user, post=self.post)
+        comment = Comment.objects.create(post=self.post, author=self.user, content='Nice')
+        # Both rows exist, but the counters have drifted to zero.
+        Post.objects.filter(pk=self.post.pk).update(like_count=0, comment_count=0)
+
+        response = self.client.post(reverse('post-unlike', kwargs={'pk': self.post.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.delete(reverse('post-comments-detail', kwargs={'post_pk': self.post.pk, 'pk': comment.pk}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.like_count, self.post.comment_count), (0, 0))
+        self.assertFalse(Like.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+
+    def test_bulk_like(self):
+        other = Post.objects.create(author=self.author, title='Other', content='Body')
+        Like.objects.create(user=self.user, post=self.post)
+
+        response = self.client.post(
+            reverse('post-bulk-like'),
+            {'post_ids': [self.post.pk, other.pk, 9999]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['liked'], [other.pk])
+        self.assertEqual(response.data['already_liked'], [self.post.pk])
+        self.assertEqual(response.data['not_found'], [9999])
+        other.refresh_from_db()
+        self.assertEqual(other.like_count, 1)
+        self.assertEqual(self.author.notifications.count(), 1)
+
+    def test_bulk_like_counts_only_inserted_rows(self):
+        other = Post.objects.create(author=self.author, title='Other', content='Body')
+        url = reverse('post-bulk-like')
+        real_insert = views.insert_ignoring_conflicts
+
+        def insert_after_concurrent_like(*args, **kwargs):
+            # Another request likes the post between the lookup and the insert.
+            Like.objects.create(user=self.user, post=other)
+            return real_insert(*args, **kwargs)
+
+        with mock.patch.object(views, 'insert_ignoring_conflicts', insert_after_concurrent_like):
+            response = self.client.post(url, {'post_ids': [self.post.pk, other.pk]}, format='json')
+        self.assertEqual(response.data['liked'], [self.post.pk])
+        self.assertEqual(response.data['already_liked'], [other.pk])
+
+        # A replay of the same request changes nothing.
+        response = self.client.post(url, {'post_ids': [self.post.pk, other.pk]}, format='json')
+        self.assertEqual(response.data['liked'], [])
+        self.assertEqual(response.data['already_liked'], [self.post.pk, other.pk])
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.like_count, 1)
+        self.assertEqual(self.author.notifications.count(), 1)
+
+    def test_bulk_like_query_count_does_not_grow(self):
+        posts = Post.objects.bulk_create([
+            Post(author=self.author, title=f'Post {i}', content='Body') for i in range(40)
+        ])
+        self.client.get(reverse('profile'))  # warm the token cache
+        query_counts = []
+        for batch in (posts[:2], posts[2:]):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(reverse('post-bulk-like'), {'post_ids': [post.pk for post in batch]}, format='json')
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CommentListTests(APITestCase):
+    """
+    Tests for the paginated comment list of a post.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author', password='testpassword')
+        self.post = Post.objects.create(author=self.author, title='Discussed', content='Body')
+        Comment.objects.bulk_create([
+            Comment(post=self.post, author=self.author, content=f'Comment {i}') for i in range(15)
+        ])
+
+    def test_pages_cover_every_comment_once_in_order(self):
+        url = reverse('post-comments-list', kwargs={'post_pk': self.post.pk})
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', UnorderedObjectListWarning)
+            first = self.client.get(url)
+            second = self.client.get(first.data['next'])
+        ids = [comment['id'] for comment in first.data['results'] + second.data['results']]
+        self.assertEqual(ids, list(Comment.objects.order_by('created_at', 'id').values_list('id', flat=True)))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PostSearchTests(APITestCase):
+    """
+    Tests for full-text search over posts.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.list_url = reverse('post-list')
+
+    def search(self, terms, **params):
+        response = self.client.get(self.list_url, {'search': terms, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_results_are_ranked(self):
+        Post.objects.create(author=self.author, title='Weekend plans', content='Maybe some django later')
+        Post.objects.create(author=self.author, title='Django tips', content='Django django django')
+        Post.objects.create(author=self.author, title='Unrelated', content='Nothing to see')
+
+        response = self.search('django')
+        self.assertEqual([post['title'] for post in response.data['results']], ['Django tips', 'Weekend plans'])
+
+    def test_ranked_results_paginate(self):
+        for i in range(5):
+            Post.objects.create(author=self.author, title=f'Post {i}', content='search ' * (i + 1))
+        response = self.search('search', page_size=2)
+        titles = [post['title'] for post in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            titles += [post['title'] for post in response.data['results']]
+        self.assertEqual(sorted(titles), [f'Post {i}' for i in range(5)])
+        self.assertEqual(len(titles), 5)
+
+    def test_index_follows_updates_and_deletes(self):
+        post = Post.objects.create(author=self.author, title='Draft', content='Before')
+        post.content = 'After'
+        post.save()
+        self.assertEqual(self.search('before').data['results'], [])
+        self.assertEqual(len(self.search('after').data['results']), 1)
+
+        post.delete()
+        self.assertEqual(self.search('after').data['results'], [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        Post.objects.create(author=self.author, title='Quotes', content='He said "hello" AND left')
+        self.assertEqual(len(self.search('"hello" AND (left*').data['results']), 1)
+        self.assertEqual(self.search('***').data['results'], [])
+
+    def test_rebuild_search_index(self):
+        Post.objects.bulk_create([Post(author=self.author, title='Imported', content='Bulk')])
+        self.assertEqual(self.search('imported').data['results'], [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('imported').data['results']), 1)
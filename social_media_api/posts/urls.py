@@ -3,7 +3,7 @@
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
 from django.urls import path
-from .views import PostViewSet, CommentViewSet, FeedView, LikeUnlikeView
+from .views import PostViewSet, CommentViewSet, FeedView, LikePostView, UnlikePostView, BulkLikeView
 
 # Main router for posts
 router = DefaultRouter()
@@ -15,6 +15,7 @@ comments_router.register(r'comments', CommentViewSet, basename='post-comments')
 
 urlpatterns = [
     path('feed/', FeedView.as_view(), name='user-feed'),
-    path('posts/<int:pk>/like/', LikeUnlikeView.as_view(), name='post-like'),
-    path('posts/<int:pk>/unlike/', LikeUnlikeView.as_view(), name='post-unlike'),
+    path('posts/like/', BulkLikeView.as_view(), name='post-bulk-like'),
+    path('posts/<int:pk>/like/', LikePostView.as_view(), name='post-like'),
+    path('posts/<int:pk>/unlike/', UnlikePostView.as_view(), name='post-unlike'),
 ] + router.urls + comments_router.urls
\ No newline at end of file
@@ -0,0 +1,18 @@
+# posts/versions.py
+
+from django.db import transaction
+from social_media_api.conditional import bump_version, get_version
+
+# Changes whenever any post, or a post's like or comment counter, changes.
+# It validates cached copies of post lists (see ConditionalGetMixin).
+POSTS_VERSION_KEY = 'posts:version'
+
+
+def get_posts_version():
+    return get_version(POSTS_VERSION_KEY)
+
+
+def bump_posts_version():
+    # Only after commit: bumping earlier would let a reader pair the new
+    # version with the old rows and keep getting 304 for them.
+    transaction.on_commit(lambda: bump_version(POSTS_VERSION_KEY))
@@ -1,13 +1,26 @@
 # posts/views.py
 
 from rest_framework import viewsets, permissions, generics
-from rest_framework.filters import SearchFilter
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
 from django.shortcuts import get_object_or_404
-from .models import Post, Comment
-from .serializers import PostSerializer, CommentSerializer
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.db.models.functions import Greatest
+from .models import Post, Comment, Like
+from .serializers import PostSerializer, CommentSerializer, BulkLikeSerializer
+from .feed import fan_out_post, feed_for
+from .search import PostSearchFilter, get_search_terms
+from .versions import bump_posts_version, get_posts_version
+from django.contrib.contenttypes.models import ContentType
 from notifications.models import Notification 
+from notifications.dispatch import notify, send
+from social_media_api.authentication import CachedTokenAuthentication
+from social_media_api.conditional import ConditionalGetMixin
+from social_media_api.inserts import insert_ignoring_conflicts
+from social_media_api.pagination import FeedKeysetPagination, PostKeysetPagination, PostSearchPagination
 
 class IsAuthorOrReadOnly(permissions.BasePermission):
     """
@@ -18,64 +31,185 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
             return True
         return obj.author == request.user
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
-    filter_backends = [SearchFilter]
-    search_fields = ['title', 'content']
+    pagination_class = PostKeysetPagination
+    filter_backends = [PostSearchFilter]
+
+    @property
+    def paginator(self):
+        # Search results are ranked, so they are paged by rank instead of by date.
+        if not hasattr(self, '_paginator'):
+            searching = self.action == 'list' and get_search_terms(self.request)
+            self._paginator = PostSearchPagination() if searching else self.pagination_class()
+        return self._paginator
+
+    def get_queryset(self):
+        # Load the author with each post instead of once per serialized row.
+        return PostSerializer.setup_eager_loading(super().get_queryset())
+
+    def get_list_validators(self):
+        return get_posts_version(), None
+
+    def get_object_validators(self):
+        # The counters change without touching updated_at, so they are part
+        # of the ETag and no Last-Modified is sent.
+        row = Post.objects.filter(pk=self.kwargs['pk']).values_list('updated_at', 'like_count', 'comment_count').first()
+        return row, None
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        post = serializer.save(author=self.request.user)
+        # Push the new post into the materialized feed of each follower.
+        fan_out_post(post)
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly]
 
+    def get_queryset(self):
+        # Only the comments of the post in the URL, oldest first, with their
+        # authors loaded. The tie-break on id keeps pages stable.
+        queryset = super().get_queryset().filter(post_id=self.kwargs['post_pk']).order_by('created_at', 'id')
+        return CommentSerializer.setup_eager_loading(queryset)
+
+    def get_list_validators(self):
+        # COUNT catches deletions, which leave MAX(updated_at) unchanged.
+        comments = Comment.objects.filter(post_id=self.kwargs['post_pk'])
+        return tuple(comments.aggregate(last=Max('updated_at'), count=Count('pk')).values()), None
+
+    def get_object_validators(self):
+        updated_at = (
+            Comment.objects.filter(post_id=self.kwargs['post_pk'], pk=self.kwargs['pk'])
+            .values_list('updated_at', flat=True).first()
+        )
+        return updated_at, updated_at
+
     def perform_create(self, serializer):
         post_id = self.kwargs['post_pk']
-        post = Post.objects.get(pk=post_id)
-        serializer.save(author=self.request.user, post=post)
+        post = get_object_or_404(Post, pk=post_id)
+        # The row and its counter change together or not at all.
+        with transaction.atomic():
+            serializer.save(author=self.request.user, post=post)
+            Post.objects.filter(pk=post.pk).update(comment_count=F('comment_count') + 1)
+        bump_posts_version()
+
+    def perform_destroy(self, instance):
+        post_id = instance.post_id
+        with transaction.atomic():
+            instance.delete()
+            # Never below zero, even if the counter has drifted.
+            Post.objects.filter(pk=post_id).update(comment_count=Greatest(F('comment_count') - 1, 0))
+        bump_posts_version()
 
 class FeedView(generics.ListAPIView):
     serializer_class = PostSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = FeedKeysetPagination
 
     def get_queryset(self):
-        # Retrieve the users the current user is following.
-        following_users = self.request.user.following.all()
-        
-        # Filter posts by those authors and order them by creation date.
-        return Post.objects.filter(author__in=following_users).order_by('-created_at')
-
-class LikeUnlikeView(generics.GenericAPIView):
-    authentication_classes = [TokenAuthentication]
+        # Read the user's materialized feed instead of joining the follow graph.
+        return PostSerializer.setup_eager_loading(feed_for(self.request.user))
+
+class LikePostView(generics.GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
-    
+
     def post(self, request, pk):
-        post = get_object_or_404(Post, pk=pk)
+        post = get_object_or_404(Post.objects.only('id', 'author_id'), pk=pk)
         user = request.user
-        
-        try:
-            # Check if a like from this user on this post already exists
-            like = Like.objects.get(user=user, post=post)
-            like.delete()
-            return Response({'message': 'Post unliked successfully.'}, status=status.HTTP_200_OK)
-        except Like.DoesNotExist:
-            # If it doesn't exist, create a new one
-            Like.objects.create(user=user, post=post)
-            
-            # Create a notification for the post's author
-            if user != post.author:
-                Notification.objects.create(
-                    recipient=post.author,
-                    actor=user,
-                    verb='liked your post',
-                    target=post
-                )
-            
-            return Response({'message': 'Post liked successfully.'}, status=status.HTTP_201_CREATED)
-
-generics.get_object_or_404(Post, pk=pk)", "Like.objects.get_or_create(user=request.user, post=post)"
\ No newline at end of file
+
+        # Insert and let the unique (user, post) constraint skip duplicates,
+        # so repeated or concurrent taps are a no-op instead of an error.
+        with transaction.atomic():
+            liked = insert_ignoring_conflicts(
+                Like, [{'user_id': user.pk, 'post_id': post.pk, 'created_at': timezone.now()}], returning='post_id',
+            )
+            if liked:
+                Post.objects.filter(pk=post.pk).update(like_count=F('like_count') + 1)
+        if not liked:
+            return Response({'message': 'Post already liked.'}, status=status.HTTP_200_OK)
+        bump_posts_version()
+
+        # Queue a notification for the post's author
+        if user.pk != post.author_id:
+            notify(post.author_id, user, 'liked your post', post)
+
+        return Response({'message': 'Post liked successfully.'}, status=status.HTTP_201_CREATED)
+
+class UnlikePostView(generics.GenericAPIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        # A single DELETE; the returned row count tells us whether a like existed.
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(user=request.user, post_id=pk).delete()
+            if deleted:
+                # Never below zero, even if the counter has drifted.
+                Post.objects.filter(pk=pk).update(like_count=Greatest(F('like_count') - 1, 0))
+        if deleted:
+            bump_posts_version()
+        elif not Post.objects.filter(pk=pk).exists():
+            return Response({'error': 'Post not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({'message': 'Post unliked successfully.'}, status=status.HTTP_200_OK)
+
+class BulkLikeView(generics.GenericAPIView):
+    """
+    Like many posts in one request, e.g. when a client replays offline likes.
+
+    Runs a fixed number of queries regardless of how many ids are sent.
+    Unknown ids and posts that are already liked are skipped.
+    """
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = BulkLikeSerializer
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = request.user
+
+        with transaction.atomic():
+            # Resolve every target post and its author in one query.
+            authors = dict(
+                Post.objects.filter(pk__in=set(serializer.validated_data['post_ids']))
+                .values_list('pk', 'author_id')
+            )
+            # Posts liked before, or by a concurrent request, come back
+            # missing, so counters and notifications only follow new rows.
+            now = timezone.now()
+            inserted = set(insert_ignoring_conflicts(
+                Like,
+                [{'user_id': user.pk, 'post_id': pk, 'created_at': now} for pk in authors],
+                returning='post_id',
+            ))
+            new_ids = [pk for pk in authors if pk in inserted]
+
+            if new_ids:
+                Post.objects.filter(pk__in=new_ids).update(like_count=F('like_count') + 1)
+                bump_posts_version()
+
+                post_type = ContentType.objects.get_for_model(Post)
+                send([
+                    Notification(
+                        recipient_id=authors[pk],
+                        actor=user,
+                        verb='liked your post',
+                        content_type=post_type,
+                        object_id=pk,
+                    )
+                    for pk in new_ids if authors[pk] != user.pk
+                ])
+
+        return Response({
+            'liked': new_ids,
+            'already_liked': sorted(set(authors) - inserted),
+            'not_found': sorted(set(serializer.validated_data['post_ids']) - set(authors)),
+        }, status=status.HTTP_200_OK)
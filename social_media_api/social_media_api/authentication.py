@@ -0,0 +1,142 @@
+# social_media_api/authentication.py
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    Thread-safe, size-bounded LRU mapping token keys to users, where every
+    entry also expires after a fixed number of seconds.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, key, user, ttl, max_size):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+def get_shared_cache():
+    # Optional second tier in Django's cache framework, shared by processes.
+    alias = getattr(settings, 'TOKEN_AUTH_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+
+def shared_cache_key(key):
+    # Tokens are credentials, so they are not written to the cache verbatim.
+    return 'auth:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def get_cached_auth(key):
+    """
+    Return a (user, token) pair for the token key from the cache, or None.
+
+    With a shared tier configured, a local entry only counts while the
+    shared tier still maps the token to the same user id, so a token
+    invalidated by any process stops working in every process at once.
+    """
+    entry = token_cache.get(key)
+    if entry is None:
+        return None
+    user, token = entry
+    shared = get_shared_cache()
+    if shared is not None and shared.get(shared_cache_key(key)) != user.pk:
+        token_cache.delete(key)
+        return None
+    # Each request gets its own copies, so changes a view makes to
+    # request.user or request.auth never leak into other requests.
+    user, token = copy.copy(user), copy.copy(token)
+    token.user = user
+    return user, token
+
+
+def cache_auth(token):
+    """
+    Remember an authenticated token and its user.
+
+    The user object only lives in this process. The shared tier holds just
+    the user id, which marks the token as valid; no password hash or other
+    user data is written to it.
+    """
+    ttl = getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 60)
+    if not ttl:
+        return
+    token_cache.set(token.key, (token.user, token), ttl, getattr(settings, 'TOKEN_AUTH_CACHE_SIZE', 10000))
+    shared = get_shared_cache()
+    if shared is not None:
+        shared.set(shared_cache_key(token.key), token.user_id, ttl)
+
+
+def invalidate_tokens(keys):
+    """
+    Drop the given token keys from both cache tiers.
+
+    Without a shared tier, other processes keep their own entries until the
+    TTL runs out, which is why TOKEN_AUTH_CACHE_TTL should stay short. With
+    one, they drop them on their next lookup.
+    """
+    keys = list(keys)
+    for key in keys:
+        token_cache.delete(key)
+    shared = get_shared_cache()
+    if shared is not None and keys:
+        shared.delete_many([shared_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers which user a token belongs to, so a
+    warm request runs no authentication query at all.
+
+    request.auth is always the Token instance, whether or not it came from
+    the cache. Entries live for settings.TOKEN_AUTH_CACHE_TTL seconds and
+    are dropped when a token is deleted or its user is saved
+    (accounts/signals.py). The cached user is a snapshot: views that return
+    the user's own row, like the profile, should read it fresh from the
+    database.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = get_cached_auth(key)
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        cache_auth(token)
+        return (user, token)
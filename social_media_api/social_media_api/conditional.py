@@ -0,0 +1,72 @@
+# social_media_api/conditional.py
+
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def get_version(key):
+    """
+    Return the version stamp stored under key, creating one if it is missing.
+
+    Stamps are time-based and never repeat, so a stamp evicted from the cache
+    can not come back as one a client still holds an ETag for.
+    """
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(key):
+    cache.set(key, time.time_ns(), timeout=None)
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests carrying If-None-Match or If-Modified-Since with
+    304 Not Modified before the queryset is serialized.
+
+    Views implement get_list_validators() and get_object_validators(), each
+    returning an (etag_source, last_modified) pair computed without loading
+    the rows themselves: a version stamp, an aggregate such as MAX/COUNT, or
+    a few columns of one row. Either item may be None. The ETag also covers
+    the URL, the user and the renderer, so it is safe for per-user lists,
+    filtered lists and every page of a paginated list.
+    """
+
+    def get_list_validators(self):
+        return None, None
+
+    def get_object_validators(self):
+        return None, None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(self.get_list_validators, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(self.get_object_validators, super().retrieve, request, *args, **kwargs)
+
+    def conditional_response(self, get_validators, respond, request, *args, **kwargs):
+        source, last_modified = get_validators()
+        etag = self.make_etag(source) if source is not None else None
+        timestamp = int(last_modified.timestamp()) if last_modified is not None else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = respond(request, *args, **kwargs)
+        if etag is not None:
+            response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def make_etag(self, source):
+        parts = (source, self.request.get_full_path(), self.request.user.pk, self.request.accepted_renderer.format)
+        digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+        return quote_etag(digest)
@@ -0,0 +1,86 @@
+# social_media_api/eager_loading.py
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+class EagerLoadingMixin:
+    """
+    ModelSerializer mixin that works out which relations its fields read and
+    applies the matching select_related(), prefetch_related() and only() to a
+    queryset, so serializing a page costs the same number of queries however
+    many rows it holds.
+
+    - 'author.username' style sources select the related row and load only
+      the columns that are read from it.
+    - Nested many=True serializers and many-related fields are prefetched.
+    - Plain model fields are loaded with only(); a source that is not a
+      model field (a property, a method field) turns only() off.
+
+    Views call `SerializerClass.setup_eager_loading(queryset)` in
+    get_queryset(). The paths are computed once per serializer class.
+    """
+
+    @classmethod
+    def get_eager_loading_paths(cls):
+        cached = cls.__dict__.get('_eager_loading_paths')
+        if cached is None:
+            cached = cls._build_eager_loading_paths()
+            cls._eager_loading_paths = cached
+        return cached
+
+    @classmethod
+    def _build_eager_loading_paths(cls):
+        model = cls.Meta.model
+        select, prefetch, only = set(), set(), {model._meta.pk.name}
+
+        for field in cls().fields.values():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+                only = None
+                continue
+
+            path = field.source.replace('.', '__')
+            if isinstance(field, (serializers.ListSerializer, ManyRelatedField)):
+                prefetch.add(path)
+                continue
+
+            parts = field.source.split('.')
+            if len(parts) > 1:
+                select.add('__'.join(parts[:-1]))
+                if only is not None:
+                    # only() must keep every foreign key it traverses.
+                    only.update('__'.join(parts[:depth]) for depth in range(1, len(parts)))
+            elif isinstance(field, serializers.BaseSerializer):
+                select.add(path)
+                only = None
+                continue
+            elif not isinstance(field, RelatedField) and not cls._is_model_field(model, path):
+                only = None
+                continue
+
+            if only is not None:
+                only.add(path)
+
+        return sorted(select), sorted(prefetch), sorted(only) if only is not None else None
+
+    @staticmethod
+    def _is_model_field(model, path):
+        try:
+            field = model._meta.get_field(path)
+        except FieldDoesNotExist:
+            return False
+        return field.concrete
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select, prefetch, only = cls.get_eager_loading_paths()
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        if only:
+            queryset = queryset.only(*only)
+        return queryset
@@ -0,0 +1,57 @@
+# social_media_api/inserts.py
+
+from django.db import IntegrityError, connection, transaction
+
+RETURNING_VENDORS = {'postgresql', 'sqlite'}
+
+
+def insert_ignoring_conflicts(model, rows, returning, batch_size=500):
+    """
+    Insert rows of model, skipping those that clash with a unique constraint,
+    and return the `returning` value of every row that was actually inserted.
+
+    rows are dicts mapping field names or attnames to values; every dict
+    must have the same keys and include `returning`. Unlike
+    bulk_create(ignore_conflicts=True), the caller learns which rows a
+    concurrent writer got to first, so counters and notifications can follow
+    the rows really written. Field defaults and auto_now_add are not applied.
+
+    PostgreSQL and SQLite run one INSERT ... ON CONFLICT DO NOTHING RETURNING
+    per batch; other databases insert row by row, each in a savepoint.
+    """
+    if not rows:
+        return []
+    opts = model._meta
+    fields = [opts.get_field(name) for name in rows[0]]
+    returned = opts.get_field(returning)
+
+    if connection.vendor not in RETURNING_VENDORS:
+        inserted = []
+        for row in rows:
+            try:
+                with transaction.atomic():
+                    model.objects.create(**row)
+            except IntegrityError:
+                continue
+            inserted.append(row[returning])
+        return inserted
+
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(field.column) for field in fields)
+    placeholder = '(' + ', '.join(['%s'] * len(fields)) + ')'
+    inserted = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = [
+                field.get_db_prep_save(row[name], connection)
+                for row in batch
+                for name, field in zip(rows[0], fields)
+            ]
+            cursor.execute(
+                f'INSERT INTO {qn(opts.db_table)} ({columns}) VALUES {", ".join([placeholder] * len(batch))} '
+                f'ON CONFLICT DO NOTHING RETURNING {qn(returned.column)}',
+                params,
+            )
+            inserted.extend(value for value, in cursor.fetchall())
+    return inserted
@@ -0,0 +1,150 @@
+# social_media_api/pagination.py
+
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset (cursor) pagination over a (timestamp, id) ordering.
+
+    Each page filters on the position of the last row of the previous page
+    instead of using OFFSET, and no COUNT(*) is run, so page N costs the same
+    as page 1. Subclasses set `ordering` to a (timestamp field, id field)
+    pair that is backed by a composite index. The pair may name annotations
+    of the view's queryset, so a joined table's index can drive the page
+    and the cursor alike (see FeedKeysetPagination). A first key that is not a
+    timestamp needs parse_position() and format_position() overridden.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.get_position_filter(*position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_position_filter(self, timestamp, pk):
+        # (timestamp, id) < (t, pk) written so the timestamp bound alone can
+        # drive an index range scan.
+        (time_field, time_lookup), (id_field, id_lookup) = [
+            (field.lstrip('-'), 'lt' if field.startswith('-') else 'gt') for field in self.ordering
+        ]
+        return (
+            Q(**{f'{time_field}__{time_lookup}e': timestamp})
+            & (
+                Q(**{f'{time_field}__{time_lookup}': timestamp})
+                | Q(**{time_field: timestamp, f'{id_field}__{id_lookup}': pk})
+            )
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            timestamp, pk = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').rsplit('|', 1)
+            timestamp = self.parse_position(timestamp)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if timestamp is None:
+            raise NotFound(self.invalid_cursor_message)
+        return timestamp, pk
+
+    def parse_position(self, value):
+        return parse_datetime(value)
+
+    def format_position(self, value):
+        return value.isoformat()
+
+    def encode_cursor(self, instance):
+        time_field, id_field = [field.lstrip('-') for field in self.ordering]
+        position = f'{self.format_position(getattr(instance, time_field))}|{getattr(instance, id_field)}'
+        return base64.urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class PostKeysetPagination(KeysetPagination):
+    ordering = ('-created_at', '-id')
+
+
+class FeedKeysetPagination(KeysetPagination):
+    # Keyed on the feed position annotated by posts.feed.feed_for(), so the
+    # FeedEntry index drives both the ordering and the cursor.
+    ordering = ('-feed_created_at', '-feed_post_id')
+
+
+class PostSearchPagination(KeysetPagination):
+    # Ranked search results, best match first (see posts/search.py).
+    ordering = ('-search_rank', '-id')
+
+    def parse_position(self, value):
+        return float(value)
+
+    def format_position(self, value):
+        # repr() round-trips a float exactly.
+        return repr(value)
+
+
+class NotificationKeysetPagination(KeysetPagination):
+    ordering = ('-timestamp', '-id')
+
+
+class UserCursorPagination(CursorPagination):
+    # Accounts have no creation-order timestamp worth keying on; the
+    # primary key alone is unique, so DRF's cursor pagination suffices.
+    ordering = '-id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import importlib.util
 import os
 import dj_database_url
 
@@ -98,7 +99,6 @@ WSGI_APPLICATION = 'social_media_api.wsgi.application'
 DATABASES = {
     'default': dj_database_url.config(default='sqlite:///db.sqlite3', conn_max_age=600)
 }
- ["PORT"]
 
 
 # Password validation
@@ -119,6 +119,25 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# New hashes use the first hasher: Argon2 when argon2-cffi is installed,
+# scrypt otherwise. The rest are only kept to verify existing hashes, which
+# Django rewrites with the first hasher on the next successful login, as it
+# does for hashes made with a different cost than the one configured here.
+
+PASSWORD_ARGON2_TIME_COST = 2
+PASSWORD_ARGON2_MEMORY_COST = 102400
+PASSWORD_ARGON2_PARALLELISM = 8
+PASSWORD_SCRYPT_WORK_FACTOR = 2 ** 14
+
+PASSWORD_HASHERS = [
+    'accounts.hashers.TunedScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+if importlib.util.find_spec('argon2') is not None:
+    PASSWORD_HASHERS.insert(0, 'accounts.hashers.TunedArgon2PasswordHasher')
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -147,5 +166,53 @@ AUTH_USER_MODEL = 'accounts.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10
-}
\ No newline at end of file
+    'PAGE_SIZE': 10,
+    # Login and registration are throttled per client IP before any
+    # password is hashed (accounts/throttling.py).
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '20/min',
+        'register': '10/hour',
+    },
+}
+
+# Token authentication cache
+# CachedTokenAuthentication keeps token -> user lookups in a per-process LRU
+# for TOKEN_AUTH_CACHE_TTL seconds (0 disables it). Set TOKEN_AUTH_CACHE_ALIAS
+# to a CACHES alias shared by all processes so that logouts and user changes
+# revoke cached tokens everywhere at once; it only stores user ids.
+TOKEN_AUTH_CACHE_TTL = 60
+TOKEN_AUTH_CACHE_SIZE = 10000
+TOKEN_AUTH_CACHE_ALIAS = None
+
+# Home feed
+# Posts are copied into each follower's feed on write, except for authors
+# with more followers than FEED_FANOUT_LIMIT, whose posts are merged on read.
+FEED_FANOUT_LIMIT = 10000
+FEED_BACKFILL_SIZE = 20
+
+
+# Follow graph
+# Follow checks are cached per (follower, followed) pair. "Who to follow"
+# suggestions are precomputed by 'manage.py refresh_follow_suggestions',
+# which should run periodically (e.g. nightly from cron).
+FOLLOW_CACHE_TIMEOUT = 300
+FOLLOW_SUGGESTION_LIMIT = 20
+
+
+# Notifications
+# Notifications are queued in-process and written in batches by a background
+# thread (notifications/dispatch.py). Set NOTIFICATIONS_ASYNC = False to write
+# them inside the request instead.
+NOTIFICATIONS_ASYNC = True
+NOTIFICATIONS_BATCH_SIZE = 500
+NOTIFICATIONS_FLUSH_INTERVAL = 1.0
+# Notifications for the same recipient, verb and target within this many
+# seconds are merged into one row ("X and 24 others liked your post").
+NOTIFICATIONS_COALESCE_WINDOW = 6 * 60 * 60
+NOTIFICATIONS_UNREAD_CACHE_TIMEOUT = 60
+# Delivers new notifications to open notifications/stream/ connections.
+NOTIFICATIONS_PUBSUB_BACKEND = 'notifications.pubsub.InProcessBroker'
+NOTIFICATIONS_STREAM_HEARTBEAT = 15
+# Read notifications older than this are moved to the archive table by
+# 'manage.py archive_notifications'.
+NOTIFICATIONS_RETENTION_DAYS = 30
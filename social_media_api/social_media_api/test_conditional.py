@@ -0,0 +1,78 @@
+# social_media_api/test_conditional.py
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from notifications.dispatch import write_notifications
+from notifications.models import Notification
+from posts.models import Post, Comment
+
+User = get_user_model()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, NOTIFICATIONS_ASYNC=False, NOTIFICATIONS_COALESCE_WINDOW=0)
+class ConditionalGetTests(APITestCase):
+    """
+    Tests for ETag and Last-Modified handling on the list and detail endpoints.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader')
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+        self.post = Post.objects.create(author=self.user, title='Title', content='Body')
+
+    def assertNotModified(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def assertModified(self, url, etag):
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_post_list_and_detail(self):
+        for url in (reverse('post-list'), reverse('post-detail', kwargs={'pk': self.post.pk})):
+            etag = self.client.get(url)['ETag']
+            self.assertNotModified(url, **{'If-None-Match': etag})
+
+            # The posts version is bumped once the like commits.
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('post-like', kwargs={'pk': self.post.pk}))
+            self.assertModified(url, etag)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('post-unlike', kwargs={'pk': self.post.pk}))
+
+    def test_etag_depends_on_query(self):
+        url = reverse('post-list')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url, {'page_size': 1})['ETag'], etag)
+
+    def test_comment_list_notices_deletions(self):
+        url = reverse('post-comments-list', kwargs={'post_pk': self.post.pk})
+        comments = [Comment.objects.create(post=self.post, author=self.user, content=str(i)) for i in range(2)]
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, **{'If-None-Match': etag})
+
+        comments[0].delete()
+        self.assertModified(url, etag)
+
+    def test_comment_detail_last_modified(self):
+        comment = Comment.objects.create(post=self.post, author=self.user, content='Hi')
+        url = reverse('post-comments-detail', kwargs={'post_pk': self.post.pk, 'pk': comment.pk})
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertNotModified(url, **{'If-Modified-Since': last_modified})
+
+    def test_notification_list_notices_reads(self):
+        write_notifications([Notification(recipient=self.user, actor=self.user, verb='liked your post', target=self.post)])
+        url = reverse('notification-list')
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, **{'If-None-Match': etag})
+
+        self.client.post(reverse('notification-mark-read'))
+        self.assertModified(url, etag)
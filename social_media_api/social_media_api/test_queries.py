@@ -0,0 +1,99 @@
+# social_media_api/test_queries.py
+
+from itertools import count
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from accounts.models import FollowSuggestion
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from notifications.dispatch import write_notifications
+from notifications.models import Notification
+from posts.feed import fan_out_post
+from posts.models import Post, Comment
+from .testing import QueryBudgetMixin
+
+User = get_user_model()
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, NOTIFICATIONS_COALESCE_WINDOW=0)
+class EndpointQueryCountTests(QueryBudgetMixin, APITestCase):
+    """
+    Every list and detail endpoint must run a constant number of queries
+    regardless of how many rows it serializes.
+    """
+
+    def setUp(self):
+        self.usernames = count()
+        self.user = self.create_user()
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.create(user=self.user).key)
+        self.post = Post.objects.create(author=self.create_user(), title='Title', content='Body')
+        # Warm the token cache so every measurement sees the same auth cost.
+        self.client.get(reverse('notification-unread-count'))
+
+    def create_user(self):
+        return User.objects.create_user(username=f'user{next(self.usernames)}')
+
+    def seed_posts(self, n):
+        for _ in range(n):
+            author = self.create_user()
+            author.followers.add(self.user)
+            fan_out_post(Post.objects.create(author=author, title='Title', content='Body'))
+
+    def seed_comments(self, n):
+        for _ in range(n):
+            Comment.objects.create(post=self.post, author=self.create_user(), content='Comment')
+
+    def seed_notifications(self, n):
+        write_notifications([
+            Notification(recipient=self.user, actor=actor, verb='followed you', target=actor)
+            for actor in [self.create_user() for _ in range(n)]
+        ])
+
+    def seed_followers(self, n):
+        for _ in range(n):
+            self.user.followers.add(self.create_user())
+
+    def seed_suggestions(self, n):
+        FollowSuggestion.objects.bulk_create([
+            FollowSuggestion(user=self.user, candidate=self.create_user(), mutual_count=1, computed_at=timezone.now())
+            for _ in range(n)
+        ])
+
+    def test_post_list(self):
+        self.assertQueryCountConstant(reverse('post-list'), self.seed_posts, max_queries=2)
+
+    def test_post_detail(self):
+        url = reverse('post-detail', kwargs={'pk': self.post.pk})
+        self.assertQueryCountConstant(url, self.seed_comments, max_queries=2)
+
+    def test_comment_list(self):
+        url = reverse('post-comments-list', kwargs={'post_pk': self.post.pk})
+        self.assertQueryCountConstant(url, self.seed_comments, max_queries=3)
+
+    def test_feed(self):
+        self.assertQueryCountConstant(reverse('user-feed'), self.seed_posts, max_queries=3)
+
+    def test_notification_list(self):
+        self.assertQueryCountConstant(reverse('notification-list'), self.seed_notifications, max_queries=2)
+
+    def test_notification_detail(self):
+        self.seed_notifications(1)
+        notification = Notification.objects.get()
+        url = reverse('notification-detail', kwargs={'pk': notification.pk})
+        self.assertQueryCountConstant(url, self.seed_notifications, max_queries=2)
+
+    def test_unread_count(self):
+        self.assertQueryCountConstant(reverse('notification-unread-count'), self.seed_notifications, max_queries=2)
+
+    def test_profile(self):
+        self.assertQueryCountConstant(reverse('profile'), self.seed_followers, max_queries=2)
+
+    def test_follower_list(self):
+        url = reverse('user-followers', kwargs={'user_id': self.user.pk})
+        self.assertQueryCountConstant(url, self.seed_followers, max_queries=3)
+
+    def test_follow_suggestions(self):
+        self.assertQueryCountConstant(reverse('follow-suggestions'), self.seed_suggestions, max_queries=2)